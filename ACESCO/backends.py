@@ -0,0 +1,278 @@
+"""Backends de inferencia intercambiables (PyTorch, ONNX Runtime, OpenVINO) con caché local de pesos.
+
+Todos los archivos se buscan en el directorio de caché (por defecto `models/`), sin red:
+
+    models/yolov5/                     clon local de ultralytics/yolov5 (para el backend torch)
+                                       git clone https://github.com/ultralytics/yolov5 models/yolov5
+    models/yolov5s.pt                  pesos PyTorch
+    models/yolov5s.onnx                exportado con: python models/yolov5/export.py --weights models/yolov5s.pt --include onnx
+    models/yolov5s-416.onnx            igual, con --imgsz 416
+    models/yolov5s-int8.onnx           python backends.py quantize models/yolov5s.onnx models/yolov5s-int8.onnx
+    models/yolov5s_openvino_model/     exportado con --include openvino
+
+Si falta algún archivo la carga falla con FileNotFoundError. Solo con `allow_hub=True` (MODEL_ALLOW_HUB
+en app.py) el backend torch descarga lo que falte desde torch.hub a `models/hub`, lo que requiere red.
+
+Uso: python backends.py list | python backends.py quantize <origen.onnx> <destino.onnx>
+"""
+import os
+import ast
+import time
+import argparse
+import threading
+import logging
+import numpy as np
+import cv2
+
+# Variantes seleccionables por cámara: backend, archivo dentro de la caché y tamaño de entrada
+VARIANTS = {
+    'torch': {'backend': 'torch', 'weights': 'yolov5s.pt', 'img_size': 640},
+    'onnx': {'backend': 'onnx', 'weights': 'yolov5s.onnx', 'img_size': 640},
+    'onnx-416': {'backend': 'onnx', 'weights': 'yolov5s-416.onnx', 'img_size': 416},
+    'onnx-int8': {'backend': 'onnx', 'weights': 'yolov5s-int8.onnx', 'img_size': 640},
+    'openvino': {'backend': 'openvino', 'weights': 'yolov5s_openvino_model/yolov5s.xml', 'img_size': 640},
+}
+
+
+class ModelBackend:
+    """Interfaz común: `infer(images)` recibe imágenes RGB y devuelve por imagen un array
+    (N, 6) float32 con x1, y1, x2, y2, conf, cls en coordenadas de esa imagen."""
+
+    def __init__(self, path, img_size=640, conf=0.25, iou=0.45):
+        self.path = path
+        self.img_size = img_size
+        self.conf = conf
+        self.iou = iou
+        self.names = {}
+
+    def infer(self, images):
+        raise NotImplementedError
+
+    def warmup(self, runs=2):
+        # Las primeras pasadas reservan memoria y eligen kernels; no deben caer en el primer frame real
+        image = np.zeros((self.img_size, self.img_size, 3), dtype=np.uint8)
+        started = time.perf_counter()
+        for _ in range(runs):
+            self.infer([image])
+        return (time.perf_counter() - started) * 1000
+
+
+class TorchBackend(ModelBackend):
+    def __init__(self, path, img_size=640, conf=0.25, iou=0.45, repo_dir=None, allow_hub=False):
+        super().__init__(path, img_size, conf, iou)
+        import torch
+        torch.hub.set_dir(os.path.join(os.path.dirname(path), 'hub'))
+        if repo_dir and os.path.isdir(repo_dir) and os.path.exists(path):
+            self.model = torch.hub.load(repo_dir, 'custom', path=path, source='local')
+        elif not allow_hub:
+            missing = [p for p in (repo_dir, path) if not p or not os.path.exists(p)]
+            raise FileNotFoundError(f"No existe {' ni '.join(map(str, missing))} en la caché de modelos")
+        else:
+            # Descarga explícitamente habilitada: torch.hub (requiere red; el repo queda en models/hub)
+            logging.warning(f"No se encontraron {repo_dir} y {path}; cargando YOLOv5 desde torch.hub")
+            if os.path.exists(path):
+                self.model = torch.hub.load('ultralytics/yolov5', 'custom', path=path, skip_validation=True)
+            else:
+                self.model = torch.hub.load('ultralytics/yolov5', 'yolov5s', pretrained=True, skip_validation=True)
+        self.model.conf = conf
+        self.model.iou = iou
+        self.model.eval()
+        self.names = self.model.names
+
+    def infer(self, images):
+        results = self.model(images, size=self.img_size)
+        return [preds.cpu().numpy() for preds in results.xyxy]
+
+
+class GraphBackend(ModelBackend):
+    """Pre y post-procesamiento compartido por los grafos exportados (letterbox + NMS en NumPy)."""
+
+    batch_size = 1
+
+    def infer(self, images):
+        if not images:
+            return []
+        blobs, transforms = [], []
+        for image in images:
+            blob, transform = letterbox(image, self.img_size)
+            blobs.append(blob)
+            transforms.append(transform)
+        batch = np.stack(blobs)
+        if self.batch_size:
+            # Grafo exportado con lote fijo: se ejecuta por partes
+            outputs = np.concatenate([self.run(batch[i:i + self.batch_size])
+                                      for i in range(0, len(batch), self.batch_size)])
+        else:
+            outputs = self.run(batch)
+        return [scale_boxes(non_max_suppression(output, self.conf, self.iou), transform, image.shape)
+                for output, transform, image in zip(outputs, transforms, images)]
+
+    def run(self, batch):
+        raise NotImplementedError
+
+
+class OnnxBackend(GraphBackend):
+    def __init__(self, path, img_size=640, conf=0.25, iou=0.45, threads=0):
+        super().__init__(path, img_size, conf, iou)
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.batch_size = model_input.shape[0] if isinstance(model_input.shape[0], int) else 0
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = parse_names(metadata.get('names'))
+
+    def run(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVINOBackend(GraphBackend):
+    def __init__(self, path, img_size=640, conf=0.25, iou=0.45, device='CPU'):
+        super().__init__(path, img_size, conf, iou)
+        try:
+            from openvino import Core
+        except ImportError:
+            from openvino.runtime import Core
+        core = Core()
+        model = core.read_model(path)
+        self.batch_size = 0 if model.input(0).get_partial_shape()[0].is_dynamic else model.input(0).get_shape()[0]
+        self.compiled = core.compile_model(model, device)
+        self.output = self.compiled.output(0)
+        # El exportador de YOLOv5 deja las clases en el metadata.yaml junto al .xml
+        self.names = read_metadata_names(os.path.join(os.path.dirname(path), 'metadata.yaml'))
+
+    def run(self, batch):
+        return self.compiled([batch])[self.output]
+
+
+BACKENDS = {'torch': TorchBackend, 'onnx': OnnxBackend, 'openvino': OpenVINOBackend}
+
+
+def letterbox(image, size):
+    h, w = image.shape[:2]
+    ratio = min(size / h, size / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    blob = canvas.transpose(2, 0, 1).astype(np.float32) / 255.0
+    return blob, (ratio, pad_x, pad_y)
+
+
+def non_max_suppression(output, conf_threshold, iou_threshold, max_det=300):
+    # output: (N, 5 + clases) con cx, cy, w, h, objectness, puntajes por clase
+    output = output[output[:, 4] > conf_threshold]
+    if not len(output):
+        return np.zeros((0, 6), dtype=np.float32)
+    scores = output[:, 5:] * output[:, 4:5]
+    cls = scores.argmax(axis=1)
+    conf = scores[np.arange(len(scores)), cls]
+    keep = conf > conf_threshold
+    output, cls, conf = output[keep], cls[keep], conf[keep]
+    if not len(output):
+        return np.zeros((0, 6), dtype=np.float32)
+    xy = output[:, :2] - output[:, 2:4] / 2
+    # Desplazamiento por clase para que NMS no suprima cajas de clases distintas
+    rects = np.concatenate([xy + cls[:, None] * 4096.0, output[:, 2:4]], axis=1)
+    indices = np.asarray(cv2.dnn.NMSBoxes(rects.tolist(), conf.tolist(), conf_threshold, iou_threshold)).reshape(-1)[:max_det]
+    boxes = np.concatenate([xy, xy + output[:, 2:4]], axis=1)[indices]
+    return np.concatenate([boxes, conf[indices, None], cls[indices, None]], axis=1).astype(np.float32)
+
+
+def scale_boxes(preds, transform, shape):
+    ratio, pad_x, pad_y = transform
+    preds[:, [0, 2]] = ((preds[:, [0, 2]] - pad_x) / ratio).clip(0, shape[1])
+    preds[:, [1, 3]] = ((preds[:, [1, 3]] - pad_y) / ratio).clip(0, shape[0])
+    return preds
+
+
+def parse_names(value):
+    if not value:
+        return {}
+    names = ast.literal_eval(value)
+    return dict(enumerate(names)) if isinstance(names, list) else names
+
+
+def read_metadata_names(path):
+    if not os.path.exists(path):
+        return {}
+    import yaml
+    with open(path, encoding='utf-8') as f:
+        names = yaml.safe_load(f).get('names', {})
+    return dict(enumerate(names)) if isinstance(names, list) else names
+
+
+def load_backend(variant, cache_dir='models', conf=0.25, iou=0.45, allow_hub=False):
+    backend = BACKENDS[variant['backend']]
+    path = os.path.join(cache_dir, variant['weights'])
+    if not os.path.exists(path) and variant['backend'] != 'torch':
+        raise FileNotFoundError(f"No existe {path} en la caché de modelos")
+    kwargs = {'repo_dir': os.path.join(cache_dir, 'yolov5'), 'allow_hub': allow_hub} if variant['backend'] == 'torch' else {}
+    return backend(path, variant.get('img_size', 640), conf, iou, **kwargs)
+
+
+class ModelRegistry:
+    """Carga perezosa (una vez, con warm-up) de las variantes de modelo que usan las cámaras."""
+
+    def __init__(self, cache_dir, variants=None, default='torch', conf=0.25, iou=0.45, warmup_runs=2, allow_hub=False):
+        self.cache_dir = cache_dir
+        self.allow_hub = allow_hub
+        self.variants = variants or VARIANTS
+        self.default = default
+        self.conf = conf
+        self.iou = iou
+        self.warmup_runs = warmup_runs
+        self.lock = threading.Lock()
+        self.backends = {}
+        self.load_stats = {}
+
+    def get(self, name=None):
+        name = name or self.default
+        backend = self.backends.get(name)
+        if backend is None:
+            with self.lock:
+                backend = self.backends.get(name) or self.load(name)
+        return backend
+
+    def load(self, name):
+        if name not in self.variants:
+            raise KeyError(f"Variante de modelo desconocida: {name}")
+        started = time.perf_counter()
+        backend = load_backend(self.variants[name], self.cache_dir, self.conf, self.iou, self.allow_hub)
+        load_ms = (time.perf_counter() - started) * 1000
+        warmup_ms = backend.warmup(self.warmup_runs) if self.warmup_runs else 0.0
+        self.backends[name] = backend
+        self.load_stats[name] = {"backend": self.variants[name]['backend'], "img_size": backend.img_size,
+                                 "load_ms": round(load_ms, 1), "warmup_ms": round(warmup_ms, 1)}
+        logging.info(f"Modelo {name} cargado en {load_ms:.0f} ms (warm-up {warmup_ms:.0f} ms)")
+        return backend
+
+    def get_stats(self):
+        return {"default": self.default, "available": list(self.variants), "loaded": dict(self.load_stats)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Utilidades de la caché de modelos")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    list_parser = subparsers.add_parser('list', help="variantes configuradas y si están en la caché")
+    list_parser.add_argument('--cache-dir', default='models')
+    quantize_parser = subparsers.add_parser('quantize', help="cuantiza un grafo ONNX a INT8 (pesos)")
+    quantize_parser.add_argument('source')
+    quantize_parser.add_argument('destination')
+    args = parser.parse_args()
+    if args.command == 'list':
+        for name, variant in VARIANTS.items():
+            present = os.path.exists(os.path.join(args.cache_dir, variant['weights']))
+            print(f"{name:12} {variant['backend']:9} {variant['img_size']:4}  {variant['weights']}  {'ok' if present else 'falta'}")
+    else:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(args.source, args.destination, weight_type=QuantType.QUInt8)
+        print(f"Modelo INT8 guardado en {args.destination}")
+
+
+if __name__ == '__main__':
+    main()
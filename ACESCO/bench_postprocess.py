@@ -0,0 +1,85 @@
+"""Micro-benchmark del post-procesamiento de detecciones.
+
+Compara el recorrido original en Python puro (búsquedas en model.names/class_mapping y
+claves de configuración por caja) con `postprocess.analyze` (listas hasta SMALL_N cajas,
+NumPy por encima) para 0 a 200 cajas, y verifica que ambos producen el mismo resultado.
+
+Uso: python bench_postprocess.py [--repeat 200]
+"""
+import argparse
+import timeit
+import numpy as np
+from postprocess import CompiledConfig, analyze, rectangles_array, DETECTION_CLASSES
+
+CLASS_MAPPING = {
+    'persona': 'Persona',
+    'casco': 'Casco',
+    'gafas': 'Gafas',
+    'mask': 'Tapabocas',
+    'protector auditivo': 'Protector auditivo',
+    'guantes': 'Guantes',
+    'botas': 'Botas',
+    'laminadora': 'Laminadora'
+}
+NAMES = {i: name for i, name in enumerate(list(CLASS_MAPPING) + [f"clase_{i}" for i in range(72)])}
+RECTANGLES = [(50, 50, 300, 400, 1), (350, 100, 620, 460, 2)]
+CONFIG = {f"detect-{cls.lower().replace(' ', '-')}-{area}": (i + area) % 2 == 0
+          for i, cls in enumerate(DETECTION_CLASSES) for area in (1, 2)}
+
+
+def legacy(tracked, names, config, rectangles):
+    detections = {cls: False for cls in DETECTION_CLASSES}
+    person_in_area = {1: False, 2: False}
+    render = []
+    for *xyxy, conf, cls, track_id in tracked:
+        mapped = CLASS_MAPPING.get(names[int(cls)], names[int(cls)])
+        if mapped in detections:
+            detections[mapped] = True
+            key_1 = f"detect-{mapped.lower().replace(' ', '-')}-1"
+            key_2 = f"detect-{mapped.lower().replace(' ', '-')}-2"
+            if config.get(key_1, False) or config.get(key_2, False):
+                render.append((*xyxy, conf, cls, track_id))
+    for *xyxy, conf, cls, track_id in tracked:
+        mapped = CLASS_MAPPING.get(names[int(cls)], names[int(cls)])
+        if mapped in detections:
+            x1, y1, x2, y2 = map(int, xyxy)
+            center = ((x1 + x2) // 2, (y1 + y2) // 2)
+            for rect in rectangles:
+                if rect[0] < center[0] < rect[2] and rect[1] < center[1] < rect[3]:
+                    if config.get(f"detect-{mapped.lower().replace(' ', '-')}-{rect[4]}", False):
+                        person_in_area[rect[4]] = True
+                    break
+    return detections, render, person_in_area
+
+
+def random_boxes(count, rng):
+    x1 = rng.uniform(0, 600, count)
+    y1 = rng.uniform(0, 440, count)
+    w = rng.uniform(10, 200, count)
+    h = rng.uniform(10, 300, count)
+    cls = rng.integers(0, 16, count)
+    return np.stack([x1, y1, np.minimum(x1 + w, 640), np.minimum(y1 + h, 480),
+                     rng.uniform(0.25, 1, count), cls, np.arange(count)], axis=1).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    compiled = CompiledConfig(NAMES, CLASS_MAPPING, CONFIG, "Áreas Restringidas")
+    rects = rectangles_array(RECTANGLES)
+    print(f"{'cajas':>6} {'python (us)':>12} {'numpy (us)':>12} {'speedup':>8}")
+    for count in (0, 1, 5, 10, 25, 50, 100, 200):
+        tracked = random_boxes(count, rng)
+        expected = legacy(tracked, NAMES, CONFIG, RECTANGLES)
+        detections, render_rows, _, _, person_in_area = analyze(tracked, compiled, rects, True)
+        assert detections == expected[0] and person_in_area == expected[2] and len(render_rows) == len(expected[1])
+        t_legacy = timeit.timeit(lambda: legacy(tracked, NAMES, CONFIG, RECTANGLES), number=args.repeat) / args.repeat
+        t_numpy = timeit.timeit(lambda: analyze(tracked, compiled, rects, True), number=args.repeat) / args.repeat
+        print(f"{count:>6} {t_legacy * 1e6:>12.1f} {t_numpy * 1e6:>12.1f} {t_legacy / t_numpy:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,454 @@
+"""Benchmark del pipeline completo reproduciendo videos locales como cámaras simuladas.
+
+Cada corrida levanta N `VideoStream` (1 a MAX_CAMERAS) sobre archivos de video, activa un
+módulo (EPP's, Áreas Restringidas, Temperatura), conecta un cliente MJPEG por calidad y mide
+fps de captura, latencia de procesamiento y del modelo, latencia extremo a extremo (captura ->
+publicación), costo de codificación JPEG y CPU/memoria. Los resultados se guardan en JSON
+para compararlos entre versiones (--compare).
+
+Con --dual-stream cada cámara es de doble stream: analiza el substream (--analysis-videos) y
+graba desde el principal (--videos). Se verifica que la inferencia reciba frames del substream
+y que los clips se escriban en RECORD_MAIN_SIZE; si no, el comando termina con error.
+
+Uso: python bench_replay.py [--videos a.mp4 b.mp4] [--rate realtime|max] [--duration 10]
+                            [--model stub|torch|onnx...] [--output resultados.json] [--compare base.json]
+                            [--dual-stream [--analysis-videos a_sub.mp4 b_sub.mp4]]
+Sin --videos se genera un clip sintético (con --dual-stream, uno de 1280x720 y otro de 640x360).
+Con --model stub no se necesitan pesos.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import argparse
+import threading
+import numpy as np
+import cv2
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+MODULES = ["EPP's", "Áreas Restringidas", "Temperatura"]
+# Métricas que se comparan con --compare: (ruta, True si más alto es mejor)
+COMPARED_METRICS = [
+    (('capture_fps',), True),
+    (('published_fps',), True),
+    (('process_ms', 'p95'), False),
+    (('e2e_ms', 'p95'), False),
+    (('encode_ms', 'mean'), False),
+    (('cpu_percent',), False),
+]
+
+
+def percentiles(values):
+    if not values:
+        return None
+    ordered = np.sort(np.asarray(values, dtype=np.float64))
+    return {"mean": round(float(ordered.mean()), 3),
+            "p50": round(float(np.percentile(ordered, 50)), 3),
+            "p95": round(float(np.percentile(ordered, 95)), 3),
+            "p99": round(float(np.percentile(ordered, 99)), 3),
+            "count": int(len(ordered))}
+
+
+def cpu_time():
+    if resource is None:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def memory_mb():
+    rss = None
+    try:
+        with open('/proc/self/statm') as f:
+            rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    max_rss = None
+    if resource is not None:
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+    return rss, max_rss
+
+
+def synthetic_clip(path, seconds=10, fps=20, size=(640, 480)):
+    # Escena con objetos en movimiento, para ejercitar la compuerta de movimiento y el tracker
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 60, (size[1], size[0], 3), dtype=np.uint8)
+    for i in range(seconds * fps):
+        frame = background.copy()
+        for k in range(3):
+            x = int((i * (3 + k) + k * 150) % (size[0] - 80))
+            cv2.rectangle(frame, (x, 100 + k * 100), (x + 80, 260 + k * 60), (60 + 60 * k, 200, 255 - 60 * k), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+class StubBackend:
+    """Modelo simulado: cajas deterministas que se desplazan y una latencia fija por lote y por imagen."""
+
+    def __init__(self, boxes=5, batch_ms=15.0, image_ms=5.0):
+        self.boxes = boxes
+        self.batch_ms = batch_ms
+        self.image_ms = image_ms
+        self.names = {0: 'persona', 1: 'casco', 2: 'gafas', 3: 'mask', 4: 'guantes', 5: 'botas', 6: 'laminadora'}
+        self.calls = 0
+        self.img_size = 640
+
+    def infer(self, images):
+        time.sleep((self.batch_ms + self.image_ms * len(images)) / 1000)
+        self.calls += 1
+        results = []
+        for image in images:
+            h, w = image.shape[:2]
+            k = np.arange(self.boxes)
+            x1 = (k * w / max(self.boxes, 1) + self.calls * 4) % (w * 0.8)
+            y1 = h * 0.2 + (k % 3) * h * 0.15
+            results.append(np.stack([x1, y1, x1 + w * 0.12, y1 + h * 0.4, np.full(self.boxes, 0.8),
+                                     k % len(self.names)], axis=1).astype(np.float32))
+        return results
+
+    def warmup(self, runs=2):
+        return 0.0
+
+
+class ReplayCapture:
+    """Sustituto de cv2.VideoCapture que lee un archivo en bucle, al ritmo del video o sin pausas."""
+
+    def __init__(self, path, realtime, counters):
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 20
+        self.realtime = realtime
+        self.counters = counters
+        self.next_time = time.perf_counter()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def set(self, prop, value):
+        return True
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def grab(self):
+        if self.realtime:
+            delay = self.next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.next_time = max(self.next_time, time.perf_counter() - 1.0 / self.fps) + 1.0 / self.fps
+        if not self.cap.grab():
+            # Fin del archivo: se vuelve al inicio para simular una cámara continua
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            if not self.cap.grab():
+                return False
+        self.counters['grabs'] += 1
+        return True
+
+    def retrieve(self, image=None):
+        self.counters['retrieves'] += 1
+        return self.cap.retrieve(image)
+
+    def release(self):
+        self.cap.release()
+
+
+def make_replay_stream(app):
+    class ReplayStream(app.VideoStream):
+        def __init__(self, path, camera_id, realtime, analysis_path=None):
+            self.realtime = realtime
+            self.counters = {'grabs': 0, 'retrieves': 0, 'published': 0}
+            self.main_counters = {'grabs': 0, 'retrieves': 0}
+            self.process_ms, self.e2e_ms, self.encode_ms = [], [], []
+            self.capture_time = None
+            # Verificación de doble stream: tamaños analizados y escritos en los clips
+            self.analysis_sizes, self.clip_sizes, self.clips = set(), set(), []
+            super().__init__(path, camera_id, analysis_url=analysis_path)
+            write = self.recorder.write
+
+            def recorded_write(frame):
+                self.clip_sizes.add((frame.shape[1], frame.shape[0]))
+                write(frame)
+            self.recorder.write = recorded_write
+            get_jpeg = self.broadcaster.get_jpeg
+
+            def timed_get_jpeg(tier, version, frame):
+                started = time.perf_counter()
+                data = get_jpeg(tier, version, frame)
+                self.encode_ms.append((time.perf_counter() - started) * 1000)
+                return data
+            self.broadcaster.get_jpeg = timed_get_jpeg
+
+        def open_capture(self, url=None):
+            # Sin url es el stream de captura (substream si hay doble stream); con url, el principal
+            counters = self.main_counters if url else self.counters
+            cap = ReplayCapture(url or self.capture_url, self.realtime, counters)
+            return cap if cap.isOpened() else None
+
+        def on_recording_finished(self, filename):
+            self.clips.append(filename)
+            super().on_recording_finished(filename)
+
+        def process_frame(self, frame):
+            # Hora de captura del frame que se está procesando (el último escrito en el anillo)
+            captured = self.ring.timestamp
+            self.analysis_sizes.add((frame.shape[1], frame.shape[0]))
+            started = time.perf_counter()
+            result = super().process_frame(frame)
+            self.process_ms.append((time.perf_counter() - started) * 1000)
+            self.capture_time = captured
+            return result
+
+        def publish_result(self, result):
+            super().publish_result(result)
+            self.counters['published'] += 1
+            if self.capture_time:
+                self.e2e_ms.append((time.time() - self.capture_time) * 1000)
+
+        def reset_measurements(self):
+            self.counters.update(grabs=0, retrieves=0, published=0)
+            self.process_ms, self.e2e_ms, self.encode_ms = [], [], []
+
+    return ReplayStream
+
+
+def stop_stream(stream):
+    # VideoStream.stop espera a los hilos (captura, principal, inferencia) antes de cerrar el grabador
+    stream.stop()
+
+
+def configure_module(stream, module):
+    stream.set_module_active(True, module)
+    slugs = [cls.lower().replace(' ', '-') for cls in ('Persona', 'Casco', 'Gafas', 'Tapabocas', 'Guantes', 'Botas')]
+    if module == "Áreas Restringidas":
+        stream.current_area = 1
+        stream.add_rectangle(20, 40, 310, 460)
+        stream.current_area = 2
+        stream.add_rectangle(330, 40, 620, 460)
+        stream.update_config({f"detect-{slug}-{area}": True for slug in slugs for area in (1, 2)})
+    elif module == "EPP's":
+        stream.update_config({f"config-{slug}": True for slug in slugs})
+
+
+def viewer(app, camera_id, tier, stop):
+    for _ in app.generate_frames(camera_id, tier):
+        if stop.is_set():
+            break
+
+
+def video_size(path):
+    cap = cv2.VideoCapture(path)
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))) if cap.isOpened() else None
+    cap.release()
+    return size
+
+
+def check_dual_stream(app, streams, analysis_videos):
+    # La inferencia solo debe ver frames del substream y los clips deben salir en RECORD_MAIN_SIZE
+    expected_analysis = {video_size(path) for path in analysis_videos}
+    analysis = set().union(*(s.analysis_sizes for s in streams.values()))
+    clip_frames = set().union(*(s.clip_sizes for s in streams.values()))
+    clip_files = {video_size(path) for s in streams.values() for path in s.clips if os.path.exists(path)}
+    record_size = tuple(app.RECORD_MAIN_SIZE)
+    errors = []
+    if not analysis or not analysis <= expected_analysis:
+        errors.append(f"inferencia sobre {sorted(analysis)}, se esperaba {sorted(expected_analysis)}")
+    if clip_frames - {record_size} or clip_files - {record_size}:
+        errors.append(f"clips en {sorted(clip_frames | clip_files)}, se esperaba {record_size}")
+    return {
+        "analysis_sizes": sorted(analysis),
+        "clip_frame_sizes": sorted(clip_frames),
+        "clip_file_sizes": sorted(s for s in clip_files if s),
+        "clips": sum(len(s.clips) for s in streams.values()),
+        "main_frames_decoded": sum(s.main_frames_decoded for s in streams.values()),
+        "errors": errors,
+    }
+
+
+def run_benchmark(app, ReplayStream, videos, module, cameras, args):
+    streams = {}
+    for index in range(cameras):
+        camera_id = index + 1
+        analysis = args.analysis_videos[index % len(args.analysis_videos)] if args.dual_stream else None
+        stream = ReplayStream(videos[index % len(videos)], camera_id, args.rate == 'realtime', analysis)
+        app.video_streams[camera_id] = stream
+        streams[camera_id] = stream
+        configure_module(stream, module)
+    stop = threading.Event()
+    viewers = [threading.Thread(target=viewer, args=(app, camera_id, tier, stop), daemon=True)
+               for camera_id in streams for tier in app.STREAM_TIERS]
+    for thread in viewers:
+        thread.start()
+
+    time.sleep(args.warmup)
+    for stream in streams.values():
+        stream.reset_measurements()
+    app.scheduler.batch_stats.clear()
+    cpu_started, wall_started = cpu_time(), time.perf_counter()
+    time.sleep(args.duration)
+    elapsed = time.perf_counter() - wall_started
+    cpu_used = cpu_time() - cpu_started
+    rss, max_rss = memory_mb()
+    scheduler_stats = app.scheduler.get_stats()
+
+    stop.set()
+    per_camera = {}
+    for camera_id, stream in streams.items():
+        stop_stream(stream)
+        app.video_streams.pop(camera_id, None)
+        per_camera[camera_id] = {"capture_fps": stream.counters['grabs'] / elapsed,
+                                 "decoded_fps": stream.counters['retrieves'] / elapsed,
+                                 "published_fps": stream.counters['published'] / elapsed}
+    process_ms = [v for s in streams.values() for v in s.process_ms]
+    e2e_ms = [v for s in streams.values() for v in s.e2e_ms]
+    encode_ms = [v for s in streams.values() for v in s.encode_ms]
+    run = {
+        "module": module,
+        "cameras": cameras,
+        "duration": round(elapsed, 2),
+        "capture_fps": round(sum(c["capture_fps"] for c in per_camera.values()) / cameras, 2),
+        "decoded_fps": round(sum(c["decoded_fps"] for c in per_camera.values()) / cameras, 2),
+        "published_fps": round(sum(c["published_fps"] for c in per_camera.values()) / cameras, 2),
+        "process_ms": percentiles(process_ms),
+        "model_ms": {k: round(v, 3) for k, v in scheduler_stats.items()
+                     if k in ("avg_inference_ms", "p95_inference_ms", "avg_batch_size", "avg_wait_ms")},
+        "e2e_ms": percentiles(e2e_ms),
+        "encode_ms": percentiles(encode_ms),
+        "cpu_percent": round(cpu_used / elapsed * 100, 1),
+        "rss_mb": round(rss, 1) if rss else None,
+        "max_rss_mb": round(max_rss, 1) if max_rss else None,
+    }
+    if args.dual_stream:
+        run["dual_stream"] = check_dual_stream(app, streams, args.analysis_videos)
+    return run
+
+
+def metric(run, path):
+    value = run
+    for key in path:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, encoding='utf-8') as f:
+        previous = json.load(f)
+    baseline = {(r["module"], r["cameras"]): r for r in previous["runs"]}
+    regressions = 0
+    print(f"\nComparación con {baseline_path} (umbral {threshold:.0%})")
+    for key in ("rate", "model", "model_tick_align"):
+        if previous["meta"].get(key) != results["meta"][key]:
+            print(f"Atención: {key} distinto ({previous['meta'].get(key)} vs {results['meta'][key]}), las cifras no son comparables")
+    for run in results["runs"]:
+        base = baseline.get((run["module"], run["cameras"]))
+        if not base:
+            continue
+        for path, higher_is_better in COMPARED_METRICS:
+            new, old = metric(run, path), metric(base, path)
+            if not new or not old:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = "REGRESIÓN" if worse > threshold else ""
+            regressions += bool(flag)
+            print(f"{run['module']:20} {run['cameras']} cám  {'.'.join(path):16} {old:10.2f} -> {new:10.2f} {change:+7.1%} {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--videos', nargs='*', default=[])
+    parser.add_argument('--dual-stream', action='store_true', help="cámaras de doble stream (ver --analysis-videos)")
+    parser.add_argument('--analysis-videos', nargs='*', default=[], help="substreams, en el orden de --videos")
+    parser.add_argument('--rate', choices=['realtime', 'max'], default='realtime')
+    parser.add_argument('--modules', nargs='+', default=MODULES, choices=MODULES)
+    parser.add_argument('--cameras', nargs='+', type=int, default=None, help="cantidades de cámaras (por defecto 1..MAX_CAMERAS)")
+    parser.add_argument('--duration', type=float, default=10.0, help="segundos medidos por corrida")
+    parser.add_argument('--warmup', type=float, default=3.0, help="segundos descartados al inicio de cada corrida")
+    parser.add_argument('--model', default='stub', help="'stub' o una variante de backends.VARIANTS")
+    parser.add_argument('--no-tick-align', action='store_true', help="ticks del modelo sin alinear entre cámaras (MODEL_TICK_ALIGN = False)")
+    parser.add_argument('--stub-batch-ms', type=float, default=15.0)
+    parser.add_argument('--stub-image-ms', type=float, default=5.0)
+    parser.add_argument('--workdir', default=None, help="directorio de trabajo (videos, logs); por defecto uno temporal")
+    parser.add_argument('--output', default='bench_replay.json')
+    parser.add_argument('--compare', help="resultados previos para detectar regresiones")
+    parser.add_argument('--threshold', type=float, default=0.10, help="empeoramiento relativo considerado regresión")
+    args = parser.parse_args()
+
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    videos = [os.path.abspath(v) for v in args.videos]
+    args.analysis_videos = [os.path.abspath(v) for v in args.analysis_videos]
+    if args.dual_stream and bool(videos) != bool(args.analysis_videos):
+        parser.error("--dual-stream requiere --videos y --analysis-videos juntos (o ninguno, para clips sintéticos)")
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.compare) if args.compare else None
+    models_dir = os.path.join(source_dir, 'models')
+    # Grabaciones, catálogo y logs del benchmark quedan fuera de los directorios de producción
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench_replay_')
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    sys.path.insert(0, source_dir)
+    import app
+
+    for stream in list(app.video_streams.values()):
+        stop_stream(stream)
+    app.video_streams.clear()
+    if args.model == 'stub':
+        backend = StubBackend(batch_ms=args.stub_batch_ms, image_ms=args.stub_image_ms)
+        app.model_registry.backends[app.DEFAULT_MODEL_VARIANT] = backend
+    else:
+        app.model_registry.cache_dir = models_dir
+        app.model_registry.default = args.model
+    app.MODEL_TICK_ALIGN = not args.no_tick_align
+    app.load_model()
+    if not app.model_loaded:
+        parser.error(f"No se pudo cargar el modelo {args.model}")
+
+    if not videos and args.dual_stream:
+        videos = [synthetic_clip(os.path.join(workdir, 'synthetic_main.mp4'), size=(1280, 720))]
+        args.analysis_videos = [synthetic_clip(os.path.join(workdir, 'synthetic_sub.mp4'), size=(640, 360))]
+    elif not videos:
+        videos = [synthetic_clip(os.path.join(workdir, 'synthetic.mp4'))]
+    camera_counts = args.cameras or list(range(1, app.MAX_CAMERAS + 1))
+    ReplayStream = make_replay_stream(app)
+
+    results = {
+        "meta": {"timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'), "python": platform.python_version(),
+                 "opencv": cv2.__version__, "platform": platform.platform(), "cpu_count": os.cpu_count(),
+                 "rate": args.rate, "model": args.model, "videos": videos, "duration": args.duration,
+                 "analysis_videos": args.analysis_videos if args.dual_stream else None,
+                 "load_control": app.load_controller.running, "model_tick_align": app.MODEL_TICK_ALIGN},
+        "runs": [],
+    }
+    print(f"{'módulo':20} {'cám':>3} {'captura':>8} {'publ.':>7} {'proc p95':>9} {'e2e p95':>8} {'jpeg':>6} {'cpu %':>6} {'rss MB':>7}")
+    for module in args.modules:
+        for cameras in camera_counts:
+            run = run_benchmark(app, ReplayStream, videos, module, cameras, args)
+            results["runs"].append(run)
+            print(f"{module:20} {cameras:>3} {run['capture_fps']:>8.1f} {run['published_fps']:>7.1f} "
+                  f"{metric(run, ('process_ms', 'p95')) or 0:>9.1f} {metric(run, ('e2e_ms', 'p95')) or 0:>8.1f} "
+                  f"{metric(run, ('encode_ms', 'mean')) or 0:>6.2f} {run['cpu_percent']:>6.1f} {run['rss_mb'] or 0:>7.1f}")
+            if args.dual_stream:
+                dual = run["dual_stream"]
+                print(f"{'':20} doble stream: inferencia en {dual['analysis_sizes']}, clips en {dual['clip_frame_sizes']} "
+                      f"({dual['clips']} clips, {dual['main_frames_decoded']} frames del principal) "
+                      f"{'ERROR: ' + '; '.join(dual['errors']) if dual['errors'] else 'OK'}")
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {output}")
+    dual_errors = any(run.get("dual_stream", {}).get("errors") for run in results["runs"])
+    regressions = compare(results, baseline, args.threshold) if baseline else 0
+    if regressions or dual_errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Verificación y micro-benchmark del motor térmico con frames sintéticos.
+
+Genera campos de temperatura conocidos (ambiente con puntos calientes), los colorea con la
+paleta de falso color (o en gris / radiométrico de 16 bits), y comprueba que `ThermalAnalyzer`
+recupera máxima, media y fracción caliente de cada área dentro del error de cuantización,
+y que la alarma respeta la histéresis. Luego compara el tiempo por frame contra una versión
+directa (color más cercano por píxel y máscaras por área).
+
+Uso: python bench_thermal.py [--repeat 50] [--mode palette|linear|radiometric]
+"""
+import argparse
+import timeit
+import numpy as np
+import cv2
+from postprocess import rectangles_array
+from thermal import ThermalCalibration, ThermalAnalyzer
+
+RANGE = (20.0, 120.0)
+PALETTE = cv2.COLORMAP_INFERNO
+RECTANGLES = [(40, 40, 300, 420, 1), (340, 60, 620, 460, 2)]
+HOT_THRESHOLD = 50.0
+
+
+def synthetic_temperatures(peak, rng, size=(640, 480)):
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    temps = 25.0 + rng.normal(0, 0.5, (height, width)).astype(np.float32)
+    # Punto caliente gaussiano dentro del área 1
+    temps += (peak - 25.0) * np.exp(-((x - 170) ** 2 + (y - 230) ** 2) / (2 * 30.0 ** 2))
+    return np.clip(temps, *RANGE)
+
+
+def render(temps, mode):
+    if mode == 'radiometric':
+        return np.round((temps + 273.15) / 0.01).astype(np.uint16)
+    gray = np.round((temps - RANGE[0]) / (RANGE[1] - RANGE[0]) * 255).astype(np.uint8)
+    if mode == 'linear':
+        return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+    return cv2.applyColorMap(gray, PALETTE)
+
+
+def reference(frame, rects, mode):
+    # Versión directa: color más cercano de la paleta por píxel y una máscara por área
+    if mode == 'radiometric':
+        temps = frame.astype(np.float32) * 0.01 - 273.15
+    elif mode == 'linear':
+        temps = np.linspace(*RANGE, 256, dtype=np.float32)[frame[:, :, 0]]
+    else:
+        colors = cv2.applyColorMap(np.arange(256, dtype=np.uint8).reshape(256, 1), PALETTE).reshape(256, 3)
+        pixels = frame.reshape(-1, 3).astype(np.int32)
+        nearest = np.empty(len(pixels), dtype=np.int64)
+        for start in range(0, len(pixels), 8192):
+            block = pixels[start:start + 8192]
+            nearest[start:start + 8192] = ((block[:, None, :] - colors[None]) ** 2).sum(axis=2).argmin(axis=1)
+        temps = np.linspace(*RANGE, 256, dtype=np.float32)[nearest].reshape(frame.shape[:2])
+    stats = {}
+    for x1, y1, x2, y2, area_id in rects:
+        mask = np.zeros(temps.shape, dtype=bool)
+        mask[y1:y2, x1:x2] = True
+        values = temps[mask]
+        stats[int(area_id)] = (values.max(), values.mean(), (values >= HOT_THRESHOLD).mean())
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--mode', choices=('palette', 'linear', 'radiometric'), default='palette')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    calibration = ThermalCalibration('linear' if args.mode != 'palette' else 'palette', PALETTE, RANGE)
+    analyzer = ThermalAnalyzer(calibration, hot_threshold=HOT_THRESHOLD, alarm_on=60.0, alarm_off=55.0)
+    rects = rectangles_array(RECTANGLES)
+    # Tolerancia: en falso color, la tabla de 5 bits por canal confunde hasta 3 pasos vecinos de la
+    # paleta (~1.2 °C sobre 100 °C); en gris, medio paso; en radiométrico, la resolución del sensor
+    step = (RANGE[1] - RANGE[0]) / 255
+    tolerance = {'palette': 3 * step, 'linear': step / 2, 'radiometric': 0.01}[args.mode]
+
+    print(f"{'pico':>6} {'área':>5} {'max':>7} {'esperado':>9} {'media':>7} {'esperada':>9} {'caliente':>9} {'alarma':>7}")
+    expected_alarms = {50: False, 65: True, 57: True, 52: False, 90: True}
+    for peak, expected_alarm in expected_alarms.items():
+        temps = synthetic_temperatures(peak, rng)
+        frame = render(temps, args.mode)
+        _, stats, states = analyzer.analyze(frame, rects)
+        truth = reference(frame, rects, args.mode)
+        for area_id, (maximum, mean, hot) in truth.items():
+            area = stats[area_id]
+            assert abs(area["max"] - maximum) <= tolerance + 0.05, (area_id, area, maximum)
+            assert abs(area["mean"] - mean) <= tolerance + 0.05, (area_id, area, mean)
+            assert abs(area["hot_fraction"] - hot) <= 0.02, (area_id, area, hot)
+            print(f"{peak:>6} {area_id:>5} {area['max']:>7.1f} {maximum:>9.1f} {area['mean']:>7.1f} {mean:>9.1f} "
+                  f"{area['hot_fraction']:>9.4f} {str(area['alarm']):>7}")
+        # Histéresis: 57 mantiene la alarma encendida por 65, 52 la apaga
+        assert stats[1]["alarm"] == expected_alarm and states["Calor"] == expected_alarm, (peak, stats[1])
+        assert not stats[2]["alarm"]
+    # Umbrales incoherentes (apagado sobre encendido) se rechazan en vez de oscilar en cada frame
+    try:
+        analyzer.configure({"alarm_on": 50.0, "alarm_off": 55.0})
+        raise AssertionError("alarm_off > alarm_on aceptado")
+    except ValueError:
+        pass
+
+    frame = render(synthetic_temperatures(80, rng), args.mode)
+    t_engine = timeit.timeit(lambda: analyzer.analyze(frame, rects), number=args.repeat) / args.repeat
+    t_reference = timeit.timeit(lambda: reference(frame, rects, args.mode), number=max(1, args.repeat // 10))
+    t_reference /= max(1, args.repeat // 10)
+    print(f"\nmotor: {t_engine * 1e3:.2f} ms/frame ({1 / t_engine:.0f} fps), "
+          f"directo: {t_reference * 1e3:.1f} ms/frame, {t_reference / t_engine:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
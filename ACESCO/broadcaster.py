@@ -0,0 +1,117 @@
+import threading
+import logging
+import time
+from functools import lru_cache
+import numpy as np
+import cv2
+from metrics import Histogram
+
+
+class FrameBroadcaster:
+    """Difunde el último frame procesado de una cámara a todos los clientes MJPEG.
+
+    Cada resultado nuevo se codifica a JPEG una sola vez por calidad (tier) y los mismos
+    bytes se entregan a todos los suscriptores. Un cliente lento no acumula cola: al volver
+    a pedir frame recibe directamente el más reciente y los intermedios se cuentan como descartados.
+    """
+
+    def __init__(self, tiers):
+        self.tiers = tiers
+        self.cond = threading.Condition()
+        self.result = None
+        self.version = 0
+        self.encoded = {}
+        self.encode_locks = {tier: threading.Lock() for tier in tiers}
+        self.subscribers = 0
+        self.dropped_frames = 0
+        # Tiempo (s) de redimensionado + codificación JPEG por tier, para /metrics
+        self.encode_latency = {tier: Histogram() for tier in tiers}
+        # Factor sobre la calidad JPEG de cada tier (lo baja el control de carga bajo presión)
+        self.quality_scale = 1.0
+        self.running = True
+
+    def publish(self, result):
+        with self.cond:
+            self.result = result
+            self.version += 1
+            self.cond.notify_all()
+
+    def get_jpeg(self, tier, version, frame):
+        cached = self.encoded.get(tier)
+        if cached and cached[0] == version:
+            return cached[1]
+        with self.encode_locks[tier]:
+            cached = self.encoded.get(tier)
+            if cached and cached[0] == version:
+                return cached[1]
+            started = time.perf_counter()
+            size, quality = self.tiers[tier]
+            if size and (frame.shape[1], frame.shape[0]) != size:
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            quality = max(10, int(quality * self.quality_scale))
+            ret, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+            if not ret:
+                return None
+            data = (b'--frame\r\n'
+                    b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
+            self.encoded[tier] = (version, data)
+            self.encode_latency[tier].observe(time.perf_counter() - started)
+            return data
+
+    def subscribe(self, tier, timeout=1.0, placeholder=None):
+        # `placeholder(tier)` devuelve un cuadro fijo mientras la cámara no está en vivo (conectando,
+        # reconectando, fallida) y None cuando lo está; se envía en lugar del último frame, que
+        # quedaría congelado, y se repite una vez por `timeout`
+        with self.cond:
+            self.subscribers += 1
+        last_version = 0
+        blank = placeholder(tier) if placeholder else None
+        try:
+            if blank is not None:
+                yield blank
+            while self.running:
+                try:
+                    with self.cond:
+                        self.cond.wait_for(lambda: self.version != last_version or not self.running, timeout)
+                        version, result = self.version, self.result
+                    blank = placeholder(tier) if placeholder else None
+                    if blank is not None:
+                        if self.running:
+                            yield blank
+                        # El frame que hubiera al volver en vivo ya es viejo: se espera uno nuevo
+                        last_version = version
+                        continue
+                    waiting = result is None or result.frame is None
+                    fresh = version != last_version and not waiting
+                    if fresh and last_version:
+                        self.dropped_frames += version - last_version - 1
+                    if not fresh:
+                        continue
+                    last_version = version
+                    data = self.get_jpeg(tier, version, result.frame)
+                    if data:
+                        yield data
+                except Exception as e:
+                    logging.error(f"Error en generación de frames: {e}")
+                    time.sleep(1)
+        finally:
+            with self.cond:
+                self.subscribers -= 1
+
+    def stop(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+
+
+@lru_cache(maxsize=32)
+def placeholder_jpeg(text, size, quality=70):
+    # Cuadro fijo (p. ej. "Conectando...") para los clientes de una cámara que aún no está en vivo
+    frame = np.full((size[1], size[0], 3), 40, dtype=np.uint8)
+    scale = size[0] / 640
+    (width, height), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, 2)
+    cv2.putText(frame, text, ((size[0] - width) // 2, (size[1] + height) // 2),
+                cv2.FONT_HERSHEY_SIMPLEX, scale, (200, 200, 200), 2)
+    ret, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return (b'--frame\r\n'
+            b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
@@ -0,0 +1,207 @@
+"""Catálogo SQLite de grabaciones de incidentes.
+
+Uso para importar grabaciones existentes: python catalog.py [--video-dir videos] [--db config/catalog.db]
+"""
+import os
+import re
+import queue
+import sqlite3
+import threading
+import logging
+import argparse
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    id INTEGER PRIMARY KEY,
+    filename TEXT UNIQUE NOT NULL,
+    camera_id INTEGER,
+    areas TEXT,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    size INTEGER,
+    thumbnail TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_recordings_start ON recordings (start_time);
+CREATE INDEX IF NOT EXISTS idx_recordings_camera_start ON recordings (camera_id, start_time);
+CREATE TABLE IF NOT EXISTS recording_classes (
+    recording_id INTEGER NOT NULL REFERENCES recordings (id) ON DELETE CASCADE,
+    class TEXT NOT NULL,
+    PRIMARY KEY (class, recording_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# event_<fecha>_<hora>[_cam<id>][_<n>].mp4; el sufijo _<n> separa grabaciones iniciadas en el mismo segundo
+FILENAME_PATTERN = re.compile(r'^event_(\d{8}_\d{6})(?:_cam(\d+))?(?:_\d+)?\.mp4$')
+
+
+class RecordingCatalog:
+    """Índice de grabaciones en SQLite.
+
+    Los hilos de cámara no escriben directamente: `submit` encola la llamada y el hilo del
+    catálogo hace el INSERT/UPDATE y el commit, en el mismo orden en que se encolaron.
+    """
+
+    def __init__(self, db_path, video_dir):
+        self.db_path = db_path
+        self.video_dir = video_dir
+        self.lock = threading.Lock()
+        # Nombres entregados por unique_filename cuya fila puede no estar escrita todavía
+        self.reserved = set()
+        self.writes = queue.Queue()
+        self.write_errors = 0
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA foreign_keys=ON")
+            self.conn.executescript(SCHEMA)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, method, *args):
+        self.writes.put((method, args))
+
+    def run(self):
+        while True:
+            item = self.writes.get()
+            if item is None:
+                return
+            method, args = item
+            try:
+                getattr(self, method)(*args)
+            except Exception as e:
+                self.write_errors += 1
+                logging.error(f"Error al escribir en el catálogo ({method} {args[0]}): {e}")
+
+    def stop(self, timeout=5):
+        # Vacía la cola de escrituras pendientes antes de salir
+        self.writes.put(None)
+        self.thread.join(timeout=timeout)
+
+    def unique_filename(self, filename):
+        # Dos grabaciones iniciadas en el mismo segundo comparten marca de tiempo: se agrega un
+        # sufijo en lugar de pisar el clip anterior (y su fila, con sus clases)
+        base, ext = os.path.splitext(filename)
+        candidate, n = filename, 1
+        with self.lock:
+            while (candidate in self.reserved or os.path.exists(candidate) or self.conn.execute(
+                    "SELECT 1 FROM recordings WHERE filename = ?", (os.path.basename(candidate),)).fetchone()):
+                candidate = f"{base}_{n}{ext}"
+                n += 1
+            self.reserved.add(candidate)
+        return candidate
+
+    def start(self, filename, camera_id, areas, classes, start_time):
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO recordings (filename, camera_id, areas, start_time) VALUES (?, ?, ?, ?)",
+                (os.path.basename(filename), camera_id, ','.join(str(a) for a in sorted(areas)), start_time))
+            self.reserved.discard(filename)
+            self.conn.executemany("INSERT OR IGNORE INTO recording_classes (recording_id, class) VALUES (?, ?)",
+                                  [(cursor.lastrowid, cls) for cls in classes])
+
+    def add_classes(self, filename, classes):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO recording_classes (recording_id, class) "
+                "SELECT id, ? FROM recordings WHERE filename = ?",
+                [(cls, os.path.basename(filename)) for cls in classes])
+
+    def finish(self, filename, end_time, size, thumbnail=None):
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE recordings SET end_time = ?, size = ?, thumbnail = COALESCE(?, thumbnail) WHERE filename = ?",
+                              (end_time, size, thumbnail, os.path.basename(filename)))
+
+    def set_thumbnail(self, filename, thumbnail):
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE recordings SET thumbnail = ? WHERE filename = ?",
+                              (thumbnail, os.path.basename(filename)))
+
+    def query(self, camera_id=None, start=None, end=None, cls=None, limit=50, offset=0):
+        where, params = [], []
+        if camera_id is not None:
+            where.append("r.camera_id = ?")
+            params.append(camera_id)
+        if start is not None:
+            where.append("r.start_time >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("r.start_time < ?")
+            params.append(end)
+        if cls:
+            where.append("r.id IN (SELECT recording_id FROM recording_classes WHERE class = ?)")
+            params.append(cls)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        with self.lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM recordings r {clause}", params).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT r.*, (SELECT GROUP_CONCAT(class) FROM recording_classes c WHERE c.recording_id = r.id) AS classes "
+                f"FROM recordings r {clause} ORDER BY r.start_time DESC, r.id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]).fetchall()
+        recordings = []
+        for row in rows:
+            recording = dict(row)
+            recording['classes'] = sorted(row['classes'].split(',')) if row['classes'] else []
+            recording['areas'] = [int(a) for a in row['areas'].split(',')] if row['areas'] else []
+            recording['duration'] = row['end_time'] - row['start_time'] if row['end_time'] else None
+            recordings.append(recording)
+        return total, recordings
+
+    def get(self, filename):
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM recordings WHERE filename = ?", (os.path.basename(filename),)).fetchone()
+        return dict(row) if row else None
+
+    def without_thumbnail(self, limit=1000):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT filename FROM recordings WHERE thumbnail IS NULL AND end_time IS NOT NULL "
+                "ORDER BY start_time DESC LIMIT ?", (limit,)).fetchall()
+        return [row['filename'] for row in rows]
+
+    def backfill(self, force=False):
+        # Importa (una sola vez) las grabaciones que ya estaban en disco antes del catálogo
+        with self.lock:
+            done = self.conn.execute("SELECT value FROM meta WHERE key = 'backfill_done'").fetchone()
+        if done and not force:
+            return 0
+        rows = []
+        with os.scandir(self.video_dir) as entries:
+            for entry in entries:
+                match = FILENAME_PATTERN.match(entry.name)
+                if not match or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                start_time = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").timestamp()
+                camera_id = int(match.group(2)) if match.group(2) else None
+                rows.append((entry.name, camera_id, start_time, max(stat.st_mtime, start_time), stat.st_size))
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO recordings (filename, camera_id, start_time, end_time, size) VALUES (?, ?, ?, ?, ?)",
+                rows)
+            imported = self.conn.total_changes - before
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('backfill_done', ?)",
+                              (datetime.now().isoformat(),))
+        logging.info(f"Catálogo de grabaciones: {imported} archivos importados de {self.video_dir}")
+        return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa grabaciones existentes al catálogo SQLite")
+    parser.add_argument('--video-dir', default='videos')
+    parser.add_argument('--db', default=os.path.join('config', 'catalog.db'))
+    parser.add_argument('--force', action='store_true', help="volver a escanear aunque ya se haya importado")
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(args.db) or '.', exist_ok=True)
+    catalog = RecordingCatalog(args.db, args.video_dir)
+    print(f"{catalog.backfill(force=args.force)} grabaciones importadas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Compara las variantes de modelo contra la referencia PyTorch sobre una carpeta de frames.
+
+Para cada variante reporta la latencia por frame (media, p50, p95) y la concordancia de
+detecciones con la referencia: una caja coincide si es de la misma clase y su IoU >= umbral.
+
+Uso: python compare_backends.py --frames frames/ [--variants onnx onnx-int8 onnx-416] [--baseline torch]
+"""
+import os
+import json
+import time
+import argparse
+import numpy as np
+import cv2
+from backends import VARIANTS, load_backend
+from tracker import iou_matrix
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def load_frames(folder, size=(640, 480)):
+    frames = []
+    for name in sorted(os.listdir(folder)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            image = cv2.imread(os.path.join(folder, name))
+            if image is not None:
+                # Mismo formato que recibe el modelo en app.py: 640x480 RGB
+                frames.append(cv2.cvtColor(cv2.resize(image, size), cv2.COLOR_BGR2RGB))
+    return frames
+
+
+def run_variant(backend, frames):
+    latencies, predictions = [], []
+    for frame in frames:
+        started = time.perf_counter()
+        predictions.append(backend.infer([frame])[0])
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, predictions
+
+
+def agreement(predictions, reference, iou_threshold):
+    matched = total_pred = total_ref = 0
+    for preds, refs in zip(predictions, reference):
+        total_pred += len(preds)
+        total_ref += len(refs)
+        if not len(preds) or not len(refs):
+            continue
+        iou = iou_matrix(preds[:, :4], refs[:, :4])
+        iou[preds[:, 5][:, None] != refs[:, 5][None, :]] = 0.0
+        # Emparejamiento voraz por IoU descendente
+        used_pred, used_ref = set(), set()
+        for p, r in zip(*np.unravel_index(np.argsort(-iou, axis=None), iou.shape)):
+            if iou[p, r] < iou_threshold:
+                break
+            if p in used_pred or r in used_ref:
+                continue
+            used_pred.add(p)
+            used_ref.add(r)
+        matched += len(used_pred)
+    precision = matched / total_pred if total_pred else 1.0
+    recall = matched / total_ref if total_ref else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"detections": total_pred, "reference_detections": total_ref, "matched": matched,
+            "precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4)}
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {"mean_ms": round(sum(ordered) / len(ordered), 2),
+            "p50_ms": round(ordered[len(ordered) // 2], 2),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia y concordancia de backends de modelo")
+    parser.add_argument('--frames', required=True, help="carpeta con imágenes de prueba")
+    parser.add_argument('--cache-dir', default='models')
+    parser.add_argument('--baseline', default='torch')
+    parser.add_argument('--variants', nargs='+', default=[name for name in VARIANTS if name != 'torch'])
+    parser.add_argument('--iou', type=float, default=0.5, help="IoU mínimo para considerar dos cajas iguales")
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--json', help="guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames)
+    if not frames:
+        parser.error(f"No hay imágenes en {args.frames}")
+
+    results = {}
+    reference = None
+    for name in [args.baseline] + [v for v in args.variants if v != args.baseline]:
+        try:
+            backend = load_backend(VARIANTS[name], args.cache_dir)
+        except Exception as e:
+            if name == args.baseline:
+                parser.error(f"No se pudo cargar la referencia {name}: {e}")
+            print(f"{name:12} no disponible: {e}")
+            continue
+        backend.warmup(args.warmup)
+        latencies, predictions = run_variant(backend, frames)
+        results[name] = summarize(latencies)
+        if reference is None:
+            reference = predictions
+        else:
+            results[name].update(agreement(predictions, reference, args.iou))
+
+    print(f"{len(frames)} frames, referencia: {args.baseline}")
+    print(f"{'variante':12} {'media':>8} {'p50':>8} {'p95':>8} {'precisión':>10} {'recall':>8} {'f1':>6}")
+    for name, row in results.items():
+        print(f"{name:12} {row['mean_ms']:8.1f} {row['p50_ms']:8.1f} {row['p95_ms']:8.1f} "
+              f"{row.get('precision', 1.0):10.3f} {row.get('recall', 1.0):8.3f} {row.get('f1', 1.0):6.3f}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"frames": len(frames), "baseline": args.baseline, "results": results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import os
+import json
+import queue
+import threading
+import time
+import logging
+import logging.handlers
+
+
+def setup_audit_logging(filename, level=logging.INFO):
+    """Canal de auditoría (logins, cambios de configuración, grabaciones) sin E/S en el hilo llamador.
+
+    Los registros se encolan con un QueueHandler y un QueueListener los escribe a disco
+    en segundo plano. Devuelve el listener (ya iniciado).
+    """
+    file_handler = logging.FileHandler(filename, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+class DetectionEventLog:
+    """Flujo de eventos de detección en JSON lines, escrito por un hilo en segundo plano.
+
+    `emit` nunca toca el disco: aplica un muestreo por cámara y tipo de evento
+    (`min_interval` segundos, salvo `force=True` para cambios de estado) y encola sin
+    bloquear; si la cola está llena el evento se descarta y se cuenta. El hilo escritor
+    agrupa los eventos y los escribe cada `flush_interval` segundos o cada `batch_size`
+    eventos, rotando el archivo al superar `max_bytes`.
+    """
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=5, min_interval=1.0,
+                 flush_interval=1.0, batch_size=200, queue_size=10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.min_interval = min_interval
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.last_emit = {}
+        self.emitted = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.file = None
+        self.size = 0
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def emit(self, camera_id, event, force=False, **fields):
+        now = time.time()
+        key = (camera_id, event)
+        if not force and now - self.last_emit.get(key, 0.0) < self.min_interval:
+            self.sampled_out += 1
+            return False
+        self.last_emit[key] = now
+        try:
+            self.queue.put_nowait({"ts": round(now, 3), "camera": camera_id, "event": event, **fields})
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.emitted += 1
+        return True
+
+    def run(self):
+        batch = []
+        next_flush = time.time() + self.flush_interval
+        while self.running or not self.queue.empty():
+            try:
+                batch.append(self.queue.get(timeout=max(0.0, next_flush - time.time())))
+            except queue.Empty:
+                pass
+            if len(batch) >= self.batch_size or time.time() >= next_flush:
+                if batch:
+                    try:
+                        self.write(batch)
+                    except Exception as e:
+                        logging.error(f"Error al escribir eventos de detección: {e}")
+                    batch = []
+                next_flush = time.time() + self.flush_interval
+        if batch:
+            self.write(batch)
+        if self.file:
+            self.file.close()
+
+    def write(self, batch):
+        data = ''.join(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n' for event in batch).encode('utf-8')
+        if self.file is None:
+            self.open()
+        if self.size and self.size + len(data) > self.max_bytes:
+            self.rotate()
+        self.file.write(data)
+        self.file.flush()
+        self.size += len(data)
+
+    def open(self):
+        self.file = open(self.path, 'ab')
+        self.size = self.file.tell()
+
+    def rotate(self):
+        self.file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.open()
+
+    def get_stats(self):
+        return {"emitted": self.emitted, "sampled_out": self.sampled_out, "dropped": self.dropped,
+                "queued": self.queue.qsize()}
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,67 @@
+import json
+import queue
+import threading
+
+
+class Subscription:
+    def __init__(self, camera_id, queue_size):
+        self.camera_id = camera_id
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def put(self, event):
+        # Un cliente lento pierde los eventos más viejos, nunca bloquea al publicador
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventHub:
+    """Canal de eventos push (Server-Sent Events) hacia los dashboards.
+
+    Cada conexión se suscribe a una cámara; los eventos publicados con `camera_id=None`
+    (p. ej. grabaciones nuevas) llegan a todas las suscripciones.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+
+    def subscribe(self, camera_id):
+        subscription = Subscription(camera_id, self.queue_size)
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, camera_id, event, data):
+        message = format_sse(event, data)
+        with self.lock:
+            targets = [s for s in self.subscriptions if camera_id is None or s.camera_id == camera_id]
+        for subscription in targets:
+            subscription.put(message)
+
+    def subscriber_count(self):
+        with self.lock:
+            return len(self.subscriptions)
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,102 @@
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+
+
+class FrameRing:
+    """Anillo de buffers NumPy preasignados donde el hilo de captura decodifica los frames.
+
+    Cada slot guarda el número de secuencia del frame que contiene, así los consumidores
+    saben si hay un frame nuevo. Los lectores reciben vistas de solo lectura (sin copias)
+    y mientras las usan el slot queda fijado para que la captura no lo sobrescriba.
+    El último frame escrito sirve también de respaldo cuando la cámara falla.
+    """
+
+    # Índice que devuelve next_slot cuando todos los slots están fijados por lectores
+    FULL = -1
+
+    def __init__(self, slots=4):
+        self.slots = slots
+        self.lock = threading.Lock()
+        self.buffers = None
+        self.views = None
+        self.seqs = [0] * slots
+        self.pins = [0] * slots
+        self.latest_index = None
+        self.seq = 0
+        self.consumed_seq = 0
+        self.timestamp = 0.0
+        self.next_index = 0
+
+    def allocate(self, shape, dtype):
+        self.buffers = [np.empty(shape, dtype) for _ in range(self.slots)]
+        self.views = []
+        for buffer in self.buffers:
+            view = buffer.view()
+            view.flags.writeable = False
+            self.views.append(view)
+        self.seqs = [0] * self.slots
+        self.latest_index = None
+
+    def next_slot(self):
+        # Devuelve (índice, buffer) libre para escribir: ni fijado por un lector ni el último publicado.
+        # (None, None) si el anillo aún no conoce la resolución; (FULL, None) si no hay slot libre.
+        with self.lock:
+            if self.buffers is None:
+                return None, None
+            for offset in range(self.slots):
+                index = (self.next_index + offset) % self.slots
+                if self.pins[index] == 0 and index != self.latest_index:
+                    self.next_index = (index + 1) % self.slots
+                    return index, self.buffers[index]
+            return self.FULL, None
+
+    def commit(self, index):
+        with self.lock:
+            self.seq += 1
+            self.seqs[index] = self.seq
+            self.latest_index = index
+            self.timestamp = time.time()
+
+    def store(self, frame):
+        # Camino lento: primer frame o cambio de resolución. Reasigna el anillo y copia una vez.
+        with self.lock:
+            if self.buffers is None or self.buffers[0].shape != frame.shape or self.buffers[0].dtype != frame.dtype:
+                if any(self.pins):
+                    return False
+                self.allocate(frame.shape, frame.dtype)
+        index, buffer = self.next_slot()
+        if buffer is None:
+            return False
+        np.copyto(buffer, frame)
+        self.commit(index)
+        return True
+
+    def wrote_into(self, frame, buffer):
+        return frame is buffer or (frame is not None and np.shares_memory(frame, buffer))
+
+    def needs_frame(self, max_age):
+        # True si algún lector ya tomó el último frame o si éste es más viejo que `max_age` segundos
+        with self.lock:
+            return self.latest_index is None or self.consumed_seq >= self.seq or time.time() - self.timestamp > max_age
+
+    def mark_consumed(self, seq):
+        with self.lock:
+            self.consumed_seq = max(self.consumed_seq, seq)
+
+    @contextmanager
+    def read_latest(self):
+        with self.lock:
+            index = self.latest_index
+            if index is None:
+                seq, view = 0, None
+            else:
+                self.pins[index] += 1
+                seq, view = self.seqs[index], self.views[index]
+        try:
+            yield seq, view
+        finally:
+            if index is not None:
+                with self.lock:
+                    self.pins[index] -= 1
@@ -0,0 +1,124 @@
+import time
+import logging
+import threading
+
+
+class LoadController:
+    """Degrada (y recupera) por cámara la carga del pipeline según la latencia medida.
+
+    Cada `interval` s se toma de los histogramas de cada cámara la latencia media de inferencia
+    y de codificación JPEG del último intervalo, relativa a su presupuesto. Si la peor supera
+    `high`, se baja un nivel (ver LOAD_LEVELS en app.py) a la cámara de menor prioridad; si
+    todas quedan bajo `low` durante `recover_ticks` intervalos, se sube un nivel a la de mayor
+    prioridad. Prioridad: 2 = Áreas Restringidas con un área ocupada (nunca pasa de
+    `priority_max_level`), 1 = Áreas Restringidas, 0 = resto.
+    """
+
+    def __init__(self, streams, levels, inference_budget=0.25, encode_budget=0.02, interval=2.0,
+                 high=1.0, low=0.6, recover_ticks=3, priority_max_level=1):
+        self.streams = streams
+        self.levels = levels
+        self.inference_budget = inference_budget
+        self.encode_budget = encode_budget
+        self.interval = interval
+        self.high = high
+        self.low = low
+        self.recover_ticks = recover_ticks
+        self.priority_max_level = priority_max_level
+        # cam_id -> (suma y cuenta de inferencia, suma y cuenta de codificación) del último muestreo
+        self.totals = {}
+        self.ratios = {}
+        self.pressure = 0.0
+        self.calm_ticks = 0
+        self.changes = 0
+        self.running = False
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while self.running:
+            time.sleep(self.interval)
+            try:
+                self.tick()
+            except Exception as e:
+                logging.error(f"Error en el control de carga: {e}")
+
+    def sample(self, cam_id, stats):
+        inference = stats.get("inference_latency")
+        encode = list(stats.get("encode_latency", {}).values())
+        current = (inference.sum if inference else 0.0, inference.count if inference else 0,
+                   sum(h.sum for h in encode), sum(h.count for h in encode))
+        previous = self.totals.get(cam_id)
+        self.totals[cam_id] = current
+        if previous is None:
+            return None
+        ratios = []
+        if current[1] > previous[1]:
+            ratios.append((current[0] - previous[0]) / (current[1] - previous[1]) / self.inference_budget)
+        if current[3] > previous[3]:
+            ratios.append((current[2] - previous[2]) / (current[3] - previous[3]) / self.encode_budget)
+        return max(ratios) if ratios else None
+
+    def priority(self, stream, stats):
+        if stats.get("active_module") != "Áreas Restringidas":
+            return 0
+        return 2 if any(stream.person_in_area.values()) else 1
+
+    def max_level(self, priority):
+        return min(self.priority_max_level, len(self.levels) - 1) if priority == 2 else len(self.levels) - 1
+
+    def tick(self):
+        cameras = []
+        for cam_id, stream in list(self.streams.items()):
+            stats = stream.get_stats()
+            ratio = self.sample(cam_id, stats)
+            self.ratios[cam_id] = ratio
+            cameras.append((self.priority(stream, stats), stream.load_level, cam_id, stream))
+        for cam_id in set(self.totals) - set(self.streams):
+            self.totals.pop(cam_id, None)
+            self.ratios.pop(cam_id, None)
+        self.pressure = max((r for r in self.ratios.values() if r is not None), default=0.0)
+        # Una cámara que pasa a ser prioritaria recupera de inmediato hasta su tope
+        for priority, level, cam_id, stream in cameras:
+            if level > self.max_level(priority):
+                self.apply(cam_id, stream, self.max_level(priority), "área ocupada")
+        if self.pressure > self.high:
+            self.calm_ticks = 0
+            candidates = sorted((c for c in cameras if c[1] < self.max_level(c[0])), key=lambda c: (c[0], c[1]))
+            if candidates:
+                priority, level, cam_id, stream = candidates[0]
+                self.apply(cam_id, stream, level + 1, f"presión {self.pressure:.2f}")
+        elif self.pressure < self.low:
+            self.calm_ticks += 1
+            if self.calm_ticks >= self.recover_ticks:
+                self.calm_ticks = 0
+                degraded = sorted((c for c in cameras if c[1] > 0), key=lambda c: (-c[0], -c[1]))
+                if degraded:
+                    priority, level, cam_id, stream = degraded[0]
+                    self.apply(cam_id, stream, level - 1, f"holgura {self.pressure:.2f}")
+        else:
+            self.calm_ticks = 0
+
+    def apply(self, cam_id, stream, level, reason):
+        try:
+            stream.set_load_level(level)
+        except Exception as e:
+            logging.error(f"No se pudo cambiar el modo de carga de la cámara {cam_id}: {e}")
+            return
+        self.changes += 1
+        # El intervalo siguiente mide con el modo nuevo desde cero
+        self.totals.pop(cam_id, None)
+        logging.info(f"Cámara {cam_id}: modo de carga {self.levels[level]['name']} ({reason})")
+
+    def get_stats(self):
+        return {
+            "enabled": self.running,
+            "pressure": round(self.pressure, 3),
+            "changes": self.changes,
+            "cameras": {cam_id: {"level": stream.load_level, "mode": self.levels[stream.load_level]["name"],
+                                 "pressure": None if self.ratios.get(cam_id) is None else round(self.ratios[cam_id], 3)}
+                        for cam_id, stream in list(self.streams.items())},
+        }
@@ -0,0 +1,105 @@
+import os
+import queue
+import threading
+import logging
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+
+def preview_paths(filename):
+    base = os.path.splitext(filename)[0]
+    return f"{base}.poster.jpg", f"{base}.sprite.jpg"
+
+
+class PreviewBuilder:
+    """Genera en segundo plano el póster y la tira de previsualización (sprite) de cada clip.
+
+    Ambos se guardan junto a la grabación (`event_x.poster.jpg`, `event_x.sprite.jpg`); el
+    sprite son `sprite_frames` cuadros de `tile_size` distribuidos a lo largo del clip, en una
+    sola fila, para poder previsualizar sin decodificar el video en el navegador.
+    """
+
+    def __init__(self, tile_size=(160, 120), sprite_frames=10, poster_size=(320, 240), quality=75):
+        self.tile_size = tile_size
+        self.sprite_frames = sprite_frames
+        self.poster_size = poster_size
+        self.quality = quality
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, filename, on_done=None):
+        self.queue.put((filename, on_done))
+
+    def run(self):
+        while True:
+            filename, on_done = self.queue.get()
+            poster = None
+            try:
+                poster = self.build(filename)
+            except Exception as e:
+                logging.error(f"Error al generar previsualización de {filename}: {e}")
+            if on_done:
+                try:
+                    on_done(filename, poster)
+                except Exception as e:
+                    logging.error(f"Error tras generar previsualización de {filename}: {e}")
+
+    def build(self, filename):
+        poster_path, sprite_path = preview_paths(filename)
+        if os.path.exists(poster_path) and os.path.exists(sprite_path):
+            return poster_path
+        cap = cv2.VideoCapture(filename)
+        try:
+            total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if total <= 0:
+                return None
+            targets = sorted(set(np.linspace(0, total - 1, self.sprite_frames).astype(int).tolist()))
+            poster_index = targets[len(targets) // 2]
+            tiles, poster = [], None
+            index = 0
+            # Lectura secuencial: solo se convierten (retrieve) los cuadros elegidos
+            for target in targets:
+                while index < target and cap.grab():
+                    index += 1
+                ret, frame = cap.read()
+                index += 1
+                if not ret:
+                    break
+                tiles.append(cv2.resize(frame, self.tile_size, interpolation=cv2.INTER_AREA))
+                if target == poster_index:
+                    poster = cv2.resize(frame, self.poster_size, interpolation=cv2.INTER_AREA)
+        finally:
+            cap.release()
+        if not tiles:
+            return None
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), self.quality]
+        cv2.imwrite(poster_path, poster if poster is not None else tiles[0], params)
+        cv2.imwrite(sprite_path, np.hstack(tiles), params)
+        return poster_path
+
+
+class FileCache:
+    """Caché LRU en memoria de archivos pequeños (pósters y sprites), invalidada por mtime."""
+
+    def __init__(self, max_items=512):
+        self.max_items = max_items
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+
+    def get(self, path):
+        mtime = os.path.getmtime(path)
+        with self.lock:
+            cached = self.items.get(path)
+            if cached and cached[0] == mtime:
+                self.items.move_to_end(path)
+                return cached[1]
+        with open(path, 'rb') as f:
+            data = f.read()
+        with self.lock:
+            self.items[path] = (mtime, data)
+            self.items.move_to_end(path)
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+        return data
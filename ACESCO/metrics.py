@@ -0,0 +1,57 @@
+"""Métricas en formato de texto de Prometheus, sin dependencias externas.
+
+Los contadores son atributos enteros de cada objeto (frames_captured, dropped_frames, ...) y
+los histogramas solo incrementan un bucket, así que instrumentar el camino caliente no agrega
+locks. `/metrics` lee esos valores al momento del scrape y los formatea con `format_metrics`.
+"""
+from bisect import bisect_left
+
+# Límites (s) de los buckets de latencia: de 1 ms a 2.5 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def format_metrics(families):
+    """families: lista de (nombre, tipo, ayuda, [(labels, valor o Histogram), ...])."""
+    lines = []
+    for name, kind, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            if kind == 'histogram':
+                counts, total = list(value.counts), value.sum
+                cumulative = 0
+                for bound, count in zip(value.buckets + (float('inf'),), counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f"{name}_bucket{format_labels({**labels, 'le': le})} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {total}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+            else:
+                value = int(value) if isinstance(value, (bool, int)) else float(value)
+                lines.append(f"{name}{format_labels(labels)} {value}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,81 @@
+import threading
+import time
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Detector de cambios barato que decide si vale la pena correr el modelo sobre un frame.
+
+    Trabaja sobre una versión reducida, en gris y desenfocada del frame, contra un fondo
+    promediado (accumulateWeighted). Si la fracción de píxeles en movimiento supera
+    `threshold` (opcionalmente contando solo dentro de las áreas configuradas) se dispara la
+    inferencia; si no, se reutilizan las últimas detecciones hasta `refresh_interval` segundos.
+    """
+
+    def __init__(self, size=(160, 120), threshold=0.005, pixel_threshold=25, learning_rate=0.05,
+                 refresh_interval=2.0, blur=5):
+        self.size = size
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.learning_rate = learning_rate
+        self.refresh_interval = refresh_interval
+        self.blur = blur
+        self.lock = threading.Lock()
+        self.background = None
+        self.last_run = 0.0
+        self.last_motion = 0.0
+        self.executed = 0
+        self.skipped = 0
+        self.roi_key = None
+        self.roi_mask = None
+
+    def reset(self):
+        with self.lock:
+            self.background = None
+            self.last_run = 0.0
+
+    def build_roi_mask(self, rectangles, frame_size):
+        key = (tuple(rectangles), frame_size)
+        if key != self.roi_key:
+            sx, sy = self.size[0] / frame_size[0], self.size[1] / frame_size[1]
+            mask = np.zeros((self.size[1], self.size[0]), dtype=bool)
+            for x1, y1, x2, y2, _ in rectangles:
+                mask[int(y1 * sy):int(np.ceil(y2 * sy)), int(x1 * sx):int(np.ceil(x2 * sx))] = True
+            self.roi_key, self.roi_mask = key, mask
+        return self.roi_mask
+
+    def should_run(self, frame, rectangles=None):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (self.blur, self.blur), 0)
+        now = time.time()
+        with self.lock:
+            if self.background is None:
+                self.background = gray.astype(np.float32)
+                motion = 1.0
+            else:
+                changed = cv2.absdiff(gray, cv2.convertScaleAbs(self.background)) > self.pixel_threshold
+                if rectangles:
+                    roi = self.build_roi_mask(rectangles, (frame.shape[1], frame.shape[0]))
+                    motion = changed[roi].mean() if roi.any() else 0.0
+                else:
+                    motion = changed.mean()
+                cv2.accumulateWeighted(gray, self.background, self.learning_rate)
+            self.last_motion = float(motion)
+            run = motion >= self.threshold or now - self.last_run >= self.refresh_interval
+            if run:
+                self.last_run = now
+                self.executed += 1
+            else:
+                self.skipped += 1
+            return run
+
+    def get_stats(self):
+        total = self.executed + self.skipped
+        return {
+            "executed": self.executed,
+            "skipped": self.skipped,
+            "skip_ratio": self.skipped / total if total else 0.0,
+            "last_motion": self.last_motion,
+        }
@@ -0,0 +1,127 @@
+import numpy as np
+
+# Clases que reporta /detections, en el orden del panel de la interfaz
+DETECTION_CLASSES = ['Casco', 'Gafas', 'Tapabocas', 'Protector auditivo', 'Guantes', 'Botas', 'Laminadora', 'Persona']
+AREA_IDS = (1, 2)
+# Hasta este número de cajas se recorre en Python: con pocas filas crear los arrays intermedios
+# de NumPy cuesta más que el recorrido (ver bench_postprocess.py)
+SMALL_N = 24
+
+
+def config_slug(name):
+    return name.lower().replace(' ', '-')
+
+
+class CompiledConfig:
+    """Máscaras por clase del modelo, calculadas una sola vez por cambio de módulo o configuración.
+
+    Sustituyen las búsquedas en `model.names`/`class_mapping` y la construcción de claves
+    `config-…`/`detect-…-N` que antes se hacían por cada caja y cada frame.
+    """
+
+    def __init__(self, names, class_mapping, config, active_module):
+        self.names = names
+        items = list(names.items()) if isinstance(names, dict) else list(enumerate(names))
+        num_classes = max((cls_id for cls_id, _ in items), default=-1) + 1
+        self.labels = [''] * num_classes
+        self.known = np.zeros(num_classes, dtype=bool)
+        self.detection_index = np.full(num_classes, -1, dtype=np.intp)
+        self.render = np.zeros(num_classes, dtype=bool)
+        self.area_enabled = np.zeros((num_classes, max(AREA_IDS) + 1), dtype=bool)
+        for cls_id, name in items:
+            mapped = class_mapping.get(name, name)
+            self.labels[cls_id] = mapped
+            if mapped not in DETECTION_CLASSES:
+                continue
+            self.known[cls_id] = True
+            self.detection_index[cls_id] = DETECTION_CLASSES.index(mapped)
+            slug = config_slug(mapped)
+            if active_module == "EPP's":
+                self.render[cls_id] = bool(config.get(f"config-{slug}", False))
+            elif active_module == "Áreas Restringidas":
+                for area_id in AREA_IDS:
+                    self.area_enabled[cls_id, area_id] = bool(config.get(f"detect-{slug}-{area_id}", False))
+                self.render[cls_id] = self.area_enabled[cls_id].any()
+        # Las mismas tablas como listas para el recorrido de pocas cajas
+        self.detection_names = [DETECTION_CLASSES[i] if i >= 0 else None for i in self.detection_index.tolist()]
+        self.render_flags = self.render.tolist()
+        self.area_flags = self.area_enabled.tolist()
+
+
+def rectangles_array(rectangles):
+    return np.array([r[:5] for r in rectangles], dtype=np.int64).reshape(-1, 5)
+
+
+def analyze(tracked, compiled, rects, restricted):
+    """Procesa en bloque las cajas (N, 7: x1, y1, x2, y2, conf, cls, track_id).
+
+    Devuelve (detections, filas a renderizar, filas de clases conocidas, área de cada fila o 0,
+    person_in_area). Un objeto pertenece a la primera área que contiene su centro, igual que
+    el recorrido original de `self.rectangles`.
+    """
+    detections = dict.fromkeys(DETECTION_CLASSES, False)
+    person_in_area = {area_id: False for area_id in AREA_IDS}
+    if len(tracked) == 0:
+        return detections, tracked, tracked, np.zeros(0, dtype=np.int64), person_in_area
+    if len(tracked) <= SMALL_N:
+        return analyze_small(tracked, compiled, rects if restricted else (), detections, person_in_area)
+
+    cls = tracked[:, 5].astype(np.intp)
+    cls_valid = (cls >= 0) & (cls < len(compiled.known))
+    keep = cls_valid.copy()
+    keep[cls_valid] = compiled.known[cls[cls_valid]]
+    rows, cls = tracked[keep], cls[keep]
+    for index in set(compiled.detection_index[cls].tolist()):
+        detections[DETECTION_CLASSES[index]] = True
+    render_rows = rows[compiled.render[cls]]
+
+    row_areas = np.zeros(len(rows), dtype=np.int64)
+    if restricted and len(rows) and len(rects):
+        boxes = rows[:, :4].astype(np.int64)
+        cx = ((boxes[:, 0] + boxes[:, 2]) // 2)[:, None]
+        cy = ((boxes[:, 1] + boxes[:, 3]) // 2)[:, None]
+        inside = (rects[:, 0] < cx) & (cx < rects[:, 2]) & (rects[:, 1] < cy) & (cy < rects[:, 3])
+        in_any = inside.any(axis=1)
+        area_ids = rects[inside.argmax(axis=1), 4]
+        valid = in_any & (area_ids >= 0) & (area_ids < compiled.area_enabled.shape[1])
+        enabled = np.zeros(len(rows), dtype=bool)
+        enabled[valid] = compiled.area_enabled[cls[valid], area_ids[valid]]
+        row_areas = np.where(enabled, area_ids, 0)
+        for area_id in set(row_areas[enabled].tolist()):
+            person_in_area[area_id] = True
+    return detections, render_rows, rows, row_areas, person_in_area
+
+
+def analyze_small(tracked, compiled, rects, detections, person_in_area):
+    # Mismo resultado que `analyze`, fila por fila sobre listas de Python
+    keep, render, row_areas = [], [], []
+    rect_list = rects.tolist() if len(rects) else []
+    num_areas = len(compiled.area_flags[0]) if compiled.area_flags else 0
+    for i, row in enumerate(tracked.tolist()):
+        cls = int(row[5])
+        name = compiled.detection_names[cls] if 0 <= cls < len(compiled.detection_names) else None
+        if name is None:
+            continue
+        keep.append(i)
+        detections[name] = True
+        if compiled.render_flags[cls]:
+            render.append(i)
+        area = 0
+        if rect_list:
+            cx, cy = (int(row[0]) + int(row[2])) // 2, (int(row[1]) + int(row[3])) // 2
+            for x1, y1, x2, y2, area_id in rect_list:
+                if x1 < cx < x2 and y1 < cy < y2:
+                    if 0 <= area_id < num_areas and compiled.area_flags[cls][area_id]:
+                        area = area_id
+                        person_in_area[area_id] = True
+                    break
+        row_areas.append(area)
+    return (detections, take_rows(tracked, render), take_rows(tracked, keep),
+            np.array(row_areas, dtype=np.int64), person_in_area)
+
+
+def take_rows(array, indices):
+    # Sin copia cuando se conservan todas las filas (el caso común); take es más barato que a[lista]
+    if len(indices) == len(array):
+        return array
+    return array.take(indices, axis=0) if indices else array[:0]
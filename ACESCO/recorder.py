@@ -0,0 +1,163 @@
+import os
+import threading
+import queue
+import time
+import logging
+from collections import deque
+import cv2
+
+
+class EventRecorder:
+    """Grabación de incidentes en un hilo propio, con pre-roll y post-roll.
+
+    El hilo de captura solo llama a `push` (redimensiona y encola sin bloquear; si la cola
+    está llena el frame se descarta y se cuenta). El hilo escritor mantiene un buffer circular
+    con los últimos `pre_roll` segundos (en JPEG para acotar memoria), y al iniciar una
+    grabación vuelca ese buffer en el clip antes de los frames en vivo. Al detener, sigue
+    escribiendo `post_roll` segundos antes de cerrar el archivo.
+    """
+
+    def __init__(self, fps=20, size=(640, 480), pre_roll=5, post_roll=3, queue_size=60,
+                 compress_pre_roll=True, jpeg_quality=80, on_finished=None):
+        self.fps = fps
+        self.size = size
+        self.pre_roll = pre_roll
+        self.post_roll = post_roll
+        self.compress_pre_roll = compress_pre_roll
+        self.jpeg_quality = jpeg_quality
+        self.on_finished = on_finished
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.commands = queue.Queue()
+        self.buffer = deque(maxlen=max(1, int(pre_roll * fps)))
+        self.armed = False
+        self.recording = False
+        self.last_push = 0.0
+        self.dropped_frames = 0
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.writer = None
+        self.filename = None
+        self.post_roll_until = None
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def arm(self, armed):
+        # Con el pre-roll armado la captura entrega frames aunque no se esté grabando
+        self.armed = armed
+        if not armed:
+            self.commands.put(('clear',))
+
+    def active(self, include_armed=True):
+        # Grabando, en post-roll o (si se incluye) acumulando pre-roll
+        return bool((include_armed and self.armed) or self.recording or self.post_roll_until)
+
+    def wants_frame(self, now=None):
+        if not self.active():
+            return False
+        now = now or time.time()
+        return now - self.last_push >= 1.0 / self.fps
+
+    def push(self, frame):
+        self.last_push = time.time()
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size)
+        else:
+            frame = frame.copy()
+        try:
+            self.frames.put_nowait((self.last_push, frame))
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def start(self, filename):
+        self.recording = True
+        self.commands.put(('start', filename))
+
+    def stop(self):
+        self.recording = False
+        self.commands.put(('stop',))
+
+    def run(self):
+        while self.running or not self.commands.empty():
+            self.handle_commands()
+            try:
+                timestamp, frame = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                self.check_post_roll()
+                continue
+            try:
+                if self.writer is not None:
+                    self.write(frame)
+                    if self.post_roll_until and self.armed:
+                        self.buffer.append(self.encode(frame))
+                elif self.armed:
+                    self.buffer.append(self.encode(frame))
+                self.check_post_roll()
+            except Exception as e:
+                logging.error(f"Error en grabación {self.filename}: {e}")
+
+    def handle_commands(self):
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            if command[0] == 'start':
+                if self.post_roll_until:
+                    # Nuevo disparo durante el post-roll: se cierra el clip anterior y el nuevo
+                    # arranca con los frames del post-roll como pre-roll
+                    self.close()
+                if self.writer is None:
+                    self.open(command[1])
+            elif command[0] == 'stop':
+                if self.writer is not None:
+                    self.post_roll_until = time.time() + self.post_roll
+            elif command[0] == 'clear':
+                self.buffer.clear()
+            elif command[0] == 'close':
+                self.close()
+
+    def open(self, filename):
+        self.post_roll_until = None
+        self.filename = filename
+        self.writer = cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*'H264'), self.fps, self.size)
+        pre_roll = len(self.buffer)
+        while self.buffer:
+            self.write(self.decode(self.buffer.popleft()))
+        logging.info(f"Grabación iniciada: {filename} (pre-roll de {pre_roll} frames)")
+
+    def check_post_roll(self):
+        if self.post_roll_until and time.time() >= self.post_roll_until:
+            self.close()
+
+    def close(self):
+        self.post_roll_until = None
+        if self.writer is None:
+            return
+        self.writer.release()
+        self.writer = None
+        filename, self.filename = self.filename, None
+        if os.path.exists(filename):
+            self.bytes_written += os.path.getsize(filename)
+        logging.info(f"Grabación detenida: {filename}")
+        if self.on_finished:
+            self.on_finished(filename)
+
+    def write(self, frame):
+        self.writer.write(frame)
+        self.frames_written += 1
+
+    def encode(self, frame):
+        if not self.compress_pre_roll:
+            return frame
+        ret, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality])
+        return buffer if ret else frame
+
+    def decode(self, item):
+        if item.ndim == 1:
+            return cv2.imdecode(item, cv2.IMREAD_COLOR)
+        return item
+
+    def release(self):
+        self.commands.put(('close',))
+        self.running = False
@@ -0,0 +1,48 @@
+import numpy as np
+
+
+def expand(rect, margin, frame_size):
+    x1, y1, x2, y2 = rect
+    width, height = frame_size
+    return (max(0, x1 - margin), max(0, y1 - margin), min(width, x2 + margin), min(height, y2 + margin))
+
+
+def box_area(rect):
+    return max(0, rect[2] - rect[0]) * max(0, rect[3] - rect[1])
+
+
+def plan_crops(rectangles, frame_size=(640, 480), margin=48, tile_ratio=2.0):
+    """Regiones (x1, y1, x2, y2) sobre las que correr el modelo para cubrir las áreas configuradas.
+
+    Por defecto se usa la unión de todas las áreas más un margen. Si las áreas están tan
+    separadas que la unión es más de `tile_ratio` veces la suma de las áreas individuales,
+    se devuelve un recorte por área (fusionando los que se solapan).
+    """
+    crops = [expand(r[:4], margin, frame_size) for r in rectangles]
+    crops = [c for c in crops if box_area(c) > 0]
+    if not crops:
+        return []
+    union = (min(c[0] for c in crops), min(c[1] for c in crops), max(c[2] for c in crops), max(c[3] for c in crops))
+    if len(crops) == 1 or box_area(union) <= tile_ratio * sum(box_area(c) for c in crops):
+        return [union]
+    merged = []
+    for crop in sorted(crops):
+        for i, other in enumerate(merged):
+            if crop[0] < other[2] and other[0] < crop[2] and crop[1] < other[3] and other[1] < crop[3]:
+                merged[i] = (min(crop[0], other[0]), min(crop[1], other[1]), max(crop[2], other[2]), max(crop[3], other[3]))
+                break
+        else:
+            merged.append(crop)
+    return merged
+
+
+def scale_boxes(boxes, from_size, to_size):
+    """Lleva cajas (x1, y1, x2, y2, ...) de un frame de `from_size` a otro de `to_size` (ancho, alto).
+
+    Las cámaras de doble stream ven el mismo campo con distinta resolución (y a veces distinta
+    relación de aspecto), así que basta escalar cada eje por separado.
+    """
+    boxes = np.array(boxes, dtype=np.float32, ndmin=2)
+    boxes[:, [0, 2]] *= to_size[0] / from_size[0]
+    boxes[:, [1, 3]] *= to_size[1] / from_size[1]
+    return boxes
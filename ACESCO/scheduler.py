@@ -0,0 +1,147 @@
+import threading
+import queue
+import time
+import logging
+from collections import deque
+from concurrent.futures import Future
+
+
+class BatchScheduler:
+    """Agrupa los frames pendientes de todas las cámaras y los pasa al modelo en un solo lote.
+
+    Cada VideoStream llama a `infer` desde su hilo de inferencia; el scheduler espera hasta
+    `max_delay` segundos desde el primer frame pendiente (o hasta completar `max_batch_size`)
+    y devuelve a cada cámara su array de detecciones. El lote se cierra antes si ya enviaron
+    todas las cámaras (`source`) que se espera que envíen dentro del plazo, según el intervalo
+    medido entre sus envíos; con una sola cámara activa no se espera nada. Los frames de un
+    lote se agrupan por variante de modelo (`get_model(variant)`), ya que cada cámara puede
+    usar una distinta.
+    """
+
+    def __init__(self, get_model, max_batch_size=4, max_delay=0.02, history=200):
+        self.get_model = get_model
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.queue = queue.Queue()
+        self.batch_stats = deque(maxlen=history)
+        self.stats_lock = threading.Lock()
+        self.total_batches = 0
+        self.total_frames = 0
+        # source -> (último envío, intervalo medio entre envíos); solo lo usa el hilo del scheduler
+        self.sources = {}
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, image, variant=None, source=None, final=True):
+        # final=False: la misma cámara enviará más imágenes de este ciclo (recortes ROI)
+        future = Future()
+        self.queue.put((image, future, time.perf_counter(), variant, source, final))
+        return future
+
+    def infer(self, image, variant=None, timeout=None, source=None):
+        return self.submit(image, variant, source).result(timeout)
+
+    def configure(self, max_batch_size=None, max_delay=None):
+        if max_batch_size is not None:
+            self.max_batch_size = max(1, int(max_batch_size))
+        if max_delay is not None:
+            self.max_delay = max(0.0, float(max_delay))
+        logging.info(f"Scheduler de inferencia: lote máximo {self.max_batch_size}, espera máxima {self.max_delay * 1000:.0f} ms")
+
+    def run(self):
+        while self.running:
+            try:
+                first = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self.arrived(first)
+            batch = [first]
+            deadline = first[2] + self.max_delay
+            while len(batch) < self.max_batch_size and not self.complete(batch, deadline):
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                self.arrived(item)
+                batch.append(item)
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[3], []).append(item)
+            for variant, group in groups.items():
+                self.run_batch(group, variant)
+
+    def arrived(self, item):
+        submitted, source, final = item[2], item[4], item[5]
+        if source is None or not final:
+            return
+        last, interval = self.sources.get(source, (None, None))
+        if last is not None:
+            gap = submitted - last
+            interval = gap if interval is None else 0.7 * interval + 0.3 * gap
+        self.sources[source] = (submitted, interval)
+
+    def complete(self, batch, deadline):
+        # Falta alguien si una cámara del lote aún no envía su último recorte, o si otra cámara
+        # activa (envió hace menos de dos intervalos) debería enviar antes del plazo
+        present = {item[4] for item in batch}
+        finished = {item[4] for item in batch if item[5]}
+        if present - finished:
+            return False
+        now = time.perf_counter()
+        for source, (last, interval) in self.sources.items():
+            if source in present or interval is None:
+                continue
+            if now - last < 2 * interval and last + interval <= deadline:
+                return False
+        return True
+
+    def run_batch(self, batch, variant=None):
+        images = [item[0] for item in batch]
+        started = time.perf_counter()
+        try:
+            model = self.get_model(variant)
+            if model is None:
+                raise RuntimeError("Modelo no cargado")
+            results = model.infer(images)
+        except Exception as e:
+            for item in batch:
+                item[1].set_exception(e)
+            return
+        finished = time.perf_counter()
+        for item, preds in zip(batch, results):
+            item[1].set_result(preds)
+        with self.stats_lock:
+            self.total_batches += 1
+            self.total_frames += len(batch)
+            self.batch_stats.append({
+                "size": len(batch),
+                "wait_ms": (started - batch[0][2]) * 1000,
+                "inference_ms": (finished - started) * 1000,
+            })
+
+    def get_stats(self):
+        with self.stats_lock:
+            recent = list(self.batch_stats)
+            total_batches, total_frames = self.total_batches, self.total_frames
+        stats = {
+            "max_batch_size": self.max_batch_size,
+            "max_delay_ms": self.max_delay * 1000,
+            "total_batches": total_batches,
+            "total_frames": total_frames,
+            "recent_batches": len(recent),
+        }
+        if recent:
+            latencies = sorted(b["inference_ms"] for b in recent)
+            stats.update({
+                "avg_batch_size": sum(b["size"] for b in recent) / len(recent),
+                "avg_wait_ms": sum(b["wait_ms"] for b in recent) / len(recent),
+                "avg_inference_ms": sum(latencies) / len(latencies),
+                "p95_inference_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                "avg_inference_ms_per_frame": sum(b["inference_ms"] for b in recent) / sum(b["size"] for b in recent),
+            })
+        return stats
+
+    def stop(self):
+        self.running = False
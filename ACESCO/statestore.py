@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+
+class StateStore:
+    """Configuración y áreas por cámara, descifradas en memoria y persistidas en segundo plano.
+
+    Las lecturas no tocan disco. Cada cambio marca la entrada como pendiente y el hilo escritor
+    la guarda cuando lleva `write_delay` segundos sin cambios (o `max_delay` desde el primero),
+    así una ráfaga de ediciones termina en una sola escritura. Cada archivo se cifra con el
+    mismo formato de siempre y se reemplaza de forma atómica (temporal + fsync + os.replace).
+    """
+
+    def __init__(self, cipher, locations, write_delay=0.5, max_delay=5.0):
+        # locations: {tipo: (directorio, patrón)}, p. ej. {"areas": ("areas", "areas_cam{}.json")}
+        self.cipher = cipher
+        self.locations = locations
+        self.write_delay = write_delay
+        self.max_delay = max_delay
+        self.data = {kind: {} for kind in locations}
+        # (tipo, cámara) -> (primer cambio, último cambio) aún sin escribir
+        self.dirty = {}
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.changed = threading.Event()
+        self.writes = 0
+        self.write_errors = 0
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def path(self, kind, camera_id):
+        directory, pattern = self.locations[kind]
+        return os.path.join(directory, pattern.format(camera_id))
+
+    def load(self):
+        # Lectura única al arrancar: todos los archivos existentes de cada tipo
+        for kind, (directory, pattern) in self.locations.items():
+            prefix, suffix = pattern.split('{}')
+            for name in sorted(os.listdir(directory)):
+                camera_id = name[len(prefix):len(name) - len(suffix)]
+                if not (name.startswith(prefix) and name.endswith(suffix) and camera_id.isdigit()):
+                    continue
+                try:
+                    with open(os.path.join(directory, name), 'rb') as f:
+                        value = json.loads(self.cipher.decrypt(f.read()).decode())
+                except Exception as e:
+                    logging.error(f"No se pudo leer {name}: {e}")
+                    continue
+                self.data[kind][int(camera_id)] = value
+        return {kind: len(values) for kind, values in self.data.items()}
+
+    def get(self, kind, camera_id, default=None):
+        # El valor devuelto es compartido: no se debe modificar (usar set)
+        return self.data[kind].get(camera_id, default)
+
+    def set(self, kind, camera_id, value):
+        # Copia independiente (y validación de que es serializable) antes de publicarla
+        value = json.loads(json.dumps(value))
+        now = time.time()
+        with self.lock:
+            self.data[kind][camera_id] = value
+            first, _ = self.dirty.get((kind, camera_id), (now, now))
+            self.dirty[(kind, camera_id)] = (first, now)
+        self.changed.set()
+
+    def run(self):
+        while self.running:
+            self.changed.wait(1.0)
+            self.changed.clear()
+            while self.running and self.dirty:
+                time.sleep(self.write_delay)
+                self.flush(self.write_delay)
+
+    def flush(self, min_age=0.0):
+        # Escribe las entradas pendientes sin cambios desde hace `min_age` s (0: todas)
+        with self.write_lock:
+            now = time.time()
+            with self.lock:
+                keys = [key for key, (first, last) in self.dirty.items()
+                        if now - last >= min_age or now - first >= self.max_delay]
+                pending = [(key, self.data[key[0]].get(key[1])) for key in keys]
+                for key in keys:
+                    del self.dirty[key]
+            for (kind, camera_id), value in pending:
+                try:
+                    self.write(kind, camera_id, value)
+                except Exception as e:
+                    self.write_errors += 1
+                    logging.error(f"Error al guardar {kind} de la cámara {camera_id}: {e}")
+                    with self.lock:
+                        self.dirty.setdefault((kind, camera_id), (now, now))
+
+    def write(self, kind, camera_id, value):
+        filename = self.path(kind, camera_id)
+        temp = f"{filename}.tmp"
+        with open(temp, 'wb') as f:
+            f.write(self.cipher.encrypt(json.dumps(value).encode()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, filename)
+        self.writes += 1
+        logging.info(f"Estado guardado para cámara {camera_id}: {filename}")
+
+    def stop(self):
+        self.running = False
+        self.changed.set()
+        self.thread.join(timeout=2)
+        self.flush()
+
+
+class SessionStore:
+    """Sesiones en memoria con expiración por inactividad y un máximo de sesiones abiertas.
+
+    Se mantienen ordenadas por último uso, así purgar las expiradas y descartar las más
+    antiguas al superar `max_sessions` solo recorre el principio del diccionario.
+    """
+
+    def __init__(self, ttl=8 * 3600, max_sessions=1000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        # session_id -> [datos, último uso]
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def create(self, data):
+        session_id = os.urandom(16).hex()
+        now = time.time()
+        with self.lock:
+            self.purge(now)
+            self.sessions[session_id] = [data, now]
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        return session_id
+
+    def get(self, session_id):
+        if not session_id:
+            return None
+        now = time.time()
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                return None
+            if now - entry[1] > self.ttl:
+                del self.sessions[session_id]
+                return None
+            entry[1] = now
+            self.sessions.move_to_end(session_id)
+            return entry[0]
+
+    def delete(self, session_id):
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def purge(self, now):
+        while self.sessions:
+            session_id, (_, last_seen) = next(iter(self.sessions.items()))
+            if now - last_seen <= self.ttl:
+                break
+            del self.sessions[session_id]
+
+    def __len__(self):
+        return len(self.sessions)
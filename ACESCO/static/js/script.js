@@ -4,7 +4,9 @@ let isModuleActive = false;
 let currentCamera = 1;
 let isDrawing = false;
 let startX, startY;
-let lastVideoCount = 0;
+let eventSource = null;
+// Grabaciones ya mostradas en la lista de eventos
+const listedVideos = new Set();
 let sessionId = null;
 let userRole = null;
 let username = null;
@@ -64,9 +66,8 @@ async function login() {
         resetToDefault();
         onCameraClick(1);
         fetchAreas(currentCamera);
-        setInterval(checkForNewVideos, 5000);
-        setInterval(updateDetections, 1000);
         restrictUIByRole();
+        loadRecordings();
     } else {
         errorP.textContent = data.message;
         errorP.style.display = 'block';
@@ -279,9 +280,27 @@ function onCameraClick(cameraNumber) {
         btn.classList.toggle('active', parseInt(btn.dataset.camera) === cameraNumber);
     });
     document.getElementById('video-stream').src = `/video_feed?camera=${cameraNumber}`;
+    openEventStream(cameraNumber);
+    updateCameraGrid();
     fetchAreas(currentCamera);
 }
 
+// Miniaturas (tier "thumb") de las cámaras no seleccionadas
+function updateCameraGrid() {
+    const grid = document.getElementById('camera-grid');
+    grid.innerHTML = '';
+    document.querySelectorAll('.player-tabs button[data-camera]').forEach(btn => {
+        const cameraId = parseInt(btn.dataset.camera);
+        if (cameraId === currentCamera) return;
+        const img = document.createElement('img');
+        img.src = `/video_feed?camera=${cameraId}&tier=thumb`;
+        img.alt = `Cam ${cameraId}`;
+        img.title = `Cam ${cameraId}`;
+        img.addEventListener('click', () => onCameraClick(cameraId));
+        grid.appendChild(img);
+    });
+}
+
 // Añadir nueva cámara
 async function addNewCamera() {
     if (userRole !== 'Admin') return;
@@ -314,6 +333,7 @@ async function addNewCamera() {
         newButton.addEventListener('click', () => onCameraClick(newCameraId));
         newButton.addEventListener('contextmenu', (e) => onCameraRightClick(e, newCameraId));
         playerTabs.insertBefore(newButton, document.getElementById('add-camera'));
+        updateCameraGrid();
         addEvent(`Cámara ${newCameraId} agregada`, 1000);
     } else {
         addEvent(`Error: ${data.message}`, 1000);
@@ -389,6 +409,7 @@ async function onCameraRightClick(event, cameraId) {
         if (data.status === 'success') {
             document.querySelector(`.player-tabs button[data-camera="${cameraId}"]`).remove();
             if (currentCamera === cameraId) onCameraClick(1);
+            else updateCameraGrid();
             addEvent(`Cámara ${cameraId} eliminada`, 1000);
         } else {
             addEvent(`Error: ${data.message}`, 1000);
@@ -512,10 +533,15 @@ function addEvent(message, duration = 1000) {
 }
 
 // Añadir video a eventos
-function addVideoEvent(videoPath) {
+function addVideoEvent(videoPath, posterPath = null, date = new Date()) {
+    if (listedVideos.has(videoPath)) return;
+    listedVideos.add(videoPath);
     const eventsList = document.getElementById('events-list');
     const li = document.createElement('li');
     const video = document.createElement('video');
+    // Sin precarga: se muestra el póster y el clip se pide (por rangos) solo al reproducir
+    video.preload = 'none';
+    if (posterPath) video.poster = posterPath;
     video.src = videoPath;
     video.controls = true;
     video.style.width = '100px';
@@ -525,7 +551,7 @@ function addVideoEvent(videoPath) {
         videoStream.style.objectFit = 'contain';
     });
     li.appendChild(video);
-    li.appendChild(document.createTextNode(` ${new Date().toLocaleString()} - Video grabado`));
+    li.appendChild(document.createTextNode(` ${date.toLocaleString()} - Video grabado`));
     eventsList.prepend(li);
 }
 
@@ -608,35 +634,60 @@ async function deleteAllAreas() {
     }
 }
 
-// Chequear nuevos videos
-async function checkForNewVideos() {
+// Canal push (SSE): detecciones de la cámara actual y grabaciones nuevas de todas las cámaras
+function openEventStream(cameraId) {
+    if (!sessionId) return;
+    if (eventSource) eventSource.close();
+    // La sesión viaja en la cookie HttpOnly que fija /login, no en la URL
+    eventSource = new EventSource(`/events?camera=${cameraId}`);
+    eventSource.addEventListener('detections', (e) => {
+        const data = JSON.parse(e.data);
+        if (data.camera === currentCamera) applyDetections(data);
+    });
+    eventSource.addEventListener('recording', (e) => {
+        const data = JSON.parse(e.data);
+        addVideoEvent(`/videos/${data.video}`, data.poster ? `/videos/${data.video}/poster` : null);
+    });
+}
+
+// Grabaciones existentes (primera página del catálogo) al iniciar sesión; las nuevas llegan por el canal push
+async function loadRecordings() {
     const res = await fetch('/videos', {
         headers: { 'Authorization': sessionId }
     });
     const data = await res.json();
-    if (data.status === 'success' && data.videos.length > lastVideoCount) {
-        const newVideos = data.videos.slice(lastVideoCount);
-        newVideos.forEach(video => addVideoEvent(`/videos/${video}`));
-        lastVideoCount = data.videos.length;
-    }
+    if (data.status !== 'success') return;
+    // El catálogo devuelve primero las más recientes y addVideoEvent agrega al principio de la lista
+    data.recordings.filter(r => r.end_time).reverse().forEach(r => {
+        addVideoEvent(`/videos/${r.filename}`, r.thumbnail ? `/videos/${r.filename}/poster` : null,
+                      new Date(r.start_time * 1000));
+    });
 }
 
-// Actualizar detecciones
+// Actualizar detecciones (estado inicial al armar el panel; luego llegan por el canal push)
 async function updateDetections() {
     if (!isModuleActive) return;
     const res = await fetch(`/detections?camera=${currentCamera}&module=${selectedModule}`, {
         headers: { 'Authorization': sessionId }
     });
     const data = await res.json();
-    if (data.status === 'success') {
-        if (selectedModule === 'Áreas Restringidas') {
-            document.getElementById('area1').checked = data.person_in_area[1];
-            document.getElementById('area2').checked = data.person_in_area[2];
-        } else if (selectedModule === "EPP's") {
-            ['Casco', 'Gafas', 'Tapabocas', 'Protector auditivo', 'Guantes', 'Botas', 'Laminadora', 'Persona'].forEach(opt => {
-                const id = `detect-${opt.toLowerCase().replace(' ', '-')}`;
-                document.getElementById(id).checked = data.detections[opt];
-            });
-        }
+    if (data.status === 'success') applyDetections(data);
+}
+
+function applyDetections(data) {
+    if (!isModuleActive) return;
+    if (selectedModule === 'Áreas Restringidas') {
+        document.getElementById('area1').checked = data.person_in_area[1];
+        document.getElementById('area2').checked = data.person_in_area[2];
+    } else if (selectedModule === "EPP's") {
+        ['Casco', 'Gafas', 'Tapabocas', 'Protector auditivo', 'Guantes', 'Botas', 'Laminadora', 'Persona'].forEach(opt => {
+            const id = `detect-${opt.toLowerCase().replace(' ', '-')}`;
+            document.getElementById(id).checked = data.detections[opt];
+        });
+    } else if (selectedModule === 'Temperatura') {
+        ['Calor', 'Estable', 'Frío'].forEach(opt => {
+            const checkbox = document.getElementById(`detect-${opt.toLowerCase()}`);
+            if (checkbox) checkbox.checked = !!data.detections[opt];
+        });
     }
 }
\ No newline at end of file
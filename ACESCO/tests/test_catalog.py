@@ -0,0 +1,85 @@
+import os
+import time
+import pytest
+from catalog import RecordingCatalog
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    video_dir = tmp_path / "videos"
+    video_dir.mkdir()
+    catalog = RecordingCatalog(str(tmp_path / "catalog.db"), str(video_dir))
+    yield catalog
+    catalog.stop()
+
+
+def wait_for_writes(catalog, timeout=2):
+    deadline = time.time() + timeout
+    while not catalog.writes.empty() and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+
+def test_start_finish_and_query(catalog):
+    catalog.start("videos/event_20240101_101010_cam1.mp4", 1, {2, 1}, ["Persona"], 100.0)
+    catalog.add_classes("videos/event_20240101_101010_cam1.mp4", ["Casco", "Persona"])
+    catalog.finish("videos/event_20240101_101010_cam1.mp4", 130.0, 2048)
+    catalog.start("videos/event_20240101_101020_cam2.mp4", 2, [], [], 110.0)
+    total, recordings = catalog.query()
+    assert total == 2
+    assert [r['filename'] for r in recordings] == ["event_20240101_101020_cam2.mp4", "event_20240101_101010_cam1.mp4"]
+    first = recordings[1]
+    assert first['areas'] == [1, 2] and first['classes'] == ["Casco", "Persona"]
+    assert first['duration'] == 30.0 and first['size'] == 2048
+    assert recordings[0]['duration'] is None
+
+
+def test_query_filters(catalog):
+    catalog.start("a.mp4", 1, [1], ["Persona"], 100.0)
+    catalog.start("b.mp4", 2, [1], ["Casco"], 200.0)
+    assert catalog.query(camera_id=2)[0] == 1
+    assert catalog.query(start=150)[1][0]['filename'] == "b.mp4"
+    assert catalog.query(end=150)[1][0]['filename'] == "a.mp4"
+    assert catalog.query(cls="Persona")[1][0]['filename'] == "a.mp4"
+    assert len(catalog.query(limit=1, offset=1)[1]) == 1
+
+
+def test_submitted_writes_run_in_order(catalog):
+    catalog.submit('start', "a.mp4", 1, [1], ["Persona"], 100.0)
+    catalog.submit('add_classes', "a.mp4", ["Casco"])
+    catalog.submit('finish', "a.mp4", 105.0, 10)
+    catalog.submit('set_thumbnail', "a.mp4", "a.poster.jpg")
+    wait_for_writes(catalog)
+    recording = catalog.query()[1][0]
+    assert recording['classes'] == ["Casco", "Persona"] and recording['thumbnail'] == "a.poster.jpg"
+    assert catalog.write_errors == 0
+
+
+def test_duplicate_start_does_not_replace(catalog):
+    catalog.start("a.mp4", 1, [1], ["Persona"], 100.0)
+    catalog.submit('start', "a.mp4", 1, [2], [], 101.0)
+    wait_for_writes(catalog)
+    assert catalog.write_errors == 1
+    assert catalog.get("a.mp4")['start_time'] == 100.0
+    assert catalog.query()[1][0]['classes'] == ["Persona"]
+
+
+def test_unique_filename(catalog):
+    base = os.path.join(catalog.video_dir, "event_20240101_101010_cam1.mp4")
+    assert catalog.unique_filename(base) == base
+    # Reservado pero aún sin fila ni archivo
+    assert catalog.unique_filename(base).endswith("event_20240101_101010_cam1_1.mp4")
+    open(os.path.join(catalog.video_dir, "event_20240101_101010_cam1_2.mp4"), 'wb').close()
+    assert catalog.unique_filename(base).endswith("event_20240101_101010_cam1_3.mp4")
+
+
+def test_backfill_imports_once(catalog):
+    for name in ("event_20240101_101010_cam1.mp4", "event_20240101_101010_cam1_1.mp4", "event_20240101_101010.mp4",
+                 "notes.txt", "event_20240101_101010_cam1.poster.jpg"):
+        with open(os.path.join(catalog.video_dir, name), 'wb') as f:
+            f.write(b'x')
+    assert catalog.backfill() == 3
+    assert catalog.backfill() == 0
+    assert catalog.get("event_20240101_101010_cam1_1.mp4")['camera_id'] == 1
+    assert catalog.get("event_20240101_101010.mp4")['camera_id'] is None
+    assert catalog.without_thumbnail() != []
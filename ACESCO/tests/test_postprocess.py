@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+import postprocess
+from postprocess import CompiledConfig, DETECTION_CLASSES, analyze, config_slug, rectangles_array
+
+NAMES = {0: 'persona', 1: 'casco', 2: 'perro'}
+CLASS_MAPPING = {'persona': 'Persona', 'casco': 'Casco'}
+RECTS = rectangles_array([(0, 0, 320, 480, 1), (320, 0, 640, 480, 2)])
+
+
+def rows(*boxes):
+    return np.array([list(b) + [i + 1] for i, b in enumerate(boxes)], dtype=np.float32).reshape(-1, 7)
+
+
+@pytest.fixture(params=[0, 1000], ids=['numpy', 'small'])
+def small_n(request, monkeypatch):
+    # Ambos caminos de analyze deben dar el mismo resultado
+    monkeypatch.setattr(postprocess, 'SMALL_N', request.param)
+
+
+def test_config_slug():
+    assert config_slug('Protector auditivo') == 'protector-auditivo'
+
+
+def test_compiled_config_epp():
+    compiled = CompiledConfig(NAMES, CLASS_MAPPING, {'config-casco': True}, "EPP's")
+    assert compiled.labels == ['Persona', 'Casco', 'perro']
+    assert compiled.known.tolist() == [True, True, False]
+    assert compiled.render.tolist() == [False, True, False]
+
+
+def test_empty(small_n):
+    compiled = CompiledConfig(NAMES, CLASS_MAPPING, {}, "EPP's")
+    detections, render_rows, kept, row_areas, person_in_area = analyze(rows(), compiled, RECTS, False)
+    assert not any(detections.values()) and len(render_rows) == len(kept) == len(row_areas) == 0
+    assert person_in_area == {1: False, 2: False}
+
+
+def test_unknown_classes_are_dropped(small_n):
+    compiled = CompiledConfig(NAMES, CLASS_MAPPING, {'config-persona': True}, "EPP's")
+    tracked = rows((10, 10, 50, 50, 0.9, 0), (10, 10, 50, 50, 0.9, 2), (10, 10, 50, 50, 0.9, 7))
+    detections, render_rows, kept, row_areas, _ = analyze(tracked, compiled, RECTS, False)
+    assert [cls for cls in DETECTION_CLASSES if detections[cls]] == ['Persona']
+    assert kept[:, 6].tolist() == [1] and render_rows[:, 6].tolist() == [1]
+    assert row_areas.tolist() == [0]
+
+
+def test_restricted_areas(small_n):
+    config = {'detect-persona-2': True, 'detect-casco-1': True}
+    compiled = CompiledConfig(NAMES, CLASS_MAPPING, config, "Áreas Restringidas")
+    tracked = rows((100, 100, 200, 200, 0.9, 0),   # persona en el área 1 (no habilitada)
+                   (400, 100, 500, 200, 0.9, 0),   # persona en el área 2
+                   (100, 100, 200, 200, 0.9, 1))   # casco en el área 1
+    detections, render_rows, kept, row_areas, person_in_area = analyze(tracked, compiled, RECTS, True)
+    assert detections['Persona'] and detections['Casco']
+    assert row_areas.tolist() == [0, 2, 1]
+    assert person_in_area == {1: True, 2: True}
+    assert len(render_rows) == 3
+
+
+def test_restricted_off_ignores_areas(small_n):
+    compiled = CompiledConfig(NAMES, CLASS_MAPPING, {'detect-persona-1': True}, "Áreas Restringidas")
+    _, _, _, row_areas, person_in_area = analyze(rows((100, 100, 200, 200, 0.9, 0)), compiled, RECTS, False)
+    assert row_areas.tolist() == [0] and not any(person_in_area.values())
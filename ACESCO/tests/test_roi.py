@@ -0,0 +1,26 @@
+import numpy as np
+from roi import expand, plan_crops, scale_boxes
+
+
+def test_expand_clips_to_frame():
+    assert expand((10, 10, 630, 470), 48, (640, 480)) == (0, 0, 640, 480)
+
+
+def test_close_areas_use_the_union():
+    rectangles = [(100, 100, 200, 200, 1), (220, 100, 320, 200, 2)]
+    assert plan_crops(rectangles, margin=0) == [(100, 100, 320, 200)]
+
+
+def test_distant_areas_get_one_crop_each():
+    rectangles = [(0, 0, 50, 50, 1), (580, 420, 640, 480, 2)]
+    assert plan_crops(rectangles, margin=0) == [(0, 0, 50, 50), (580, 420, 640, 480)]
+
+
+def test_no_areas_or_empty_areas():
+    assert plan_crops([]) == []
+    assert plan_crops([(10, 10, 10, 10, 1)], margin=0) == []
+
+
+def test_scale_boxes_per_axis():
+    boxes = scale_boxes([[64, 48, 128, 96, 0.9, 0]], (640, 480), (1280, 720))
+    np.testing.assert_allclose(boxes[0], [128, 72, 256, 144, 0.9, 0], rtol=1e-6)
@@ -0,0 +1,64 @@
+import json
+import pytest
+from cryptography.fernet import Fernet
+from statestore import SessionStore, StateStore
+
+
+@pytest.fixture
+def cipher():
+    return Fernet(Fernet.generate_key())
+
+
+@pytest.fixture
+def locations(tmp_path):
+    (tmp_path / "areas").mkdir()
+    (tmp_path / "config").mkdir()
+    return {"areas": (str(tmp_path / "areas"), "areas_cam{}.json"),
+            "config": (str(tmp_path / "config"), "config_cam{}.json")}
+
+
+def test_set_get_and_encrypted_write(cipher, locations):
+    store = StateStore(cipher, locations, write_delay=0.01)
+    value = {"rectangles": [[1, 2, 3, 4, 1]]}
+    store.set("areas", 1, value)
+    value["rectangles"].append([0, 0, 0, 0, 2])
+    assert store.get("areas", 1) == {"rectangles": [[1, 2, 3, 4, 1]]}
+    store.stop()
+    with open(store.path("areas", 1), 'rb') as f:
+        assert json.loads(cipher.decrypt(f.read())) == {"rectangles": [[1, 2, 3, 4, 1]]}
+    assert store.get("config", 1, "default") == "default"
+
+
+def test_load_reads_saved_files_and_skips_invalid(cipher, locations, tmp_path):
+    store = StateStore(cipher, locations)
+    store.set("config", 3, {"active": True})
+    store.stop()
+    (tmp_path / "config" / "config_cam4.json").write_bytes(b"not encrypted")
+    (tmp_path / "config" / "config_camX.json").write_bytes(b"")
+    loaded = StateStore(cipher, locations)
+    assert loaded.load() == {"areas": 0, "config": 1}
+    assert loaded.get("config", 3) == {"active": True}
+    loaded.stop()
+
+
+def test_rejects_values_that_are_not_json(cipher, locations):
+    store = StateStore(cipher, locations)
+    with pytest.raises(TypeError):
+        store.set("config", 1, {"bad": object()})
+    store.stop()
+
+
+def test_session_expiry_and_limit(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("statestore.time.time", lambda: now[0])
+    sessions = SessionStore(ttl=10, max_sessions=2)
+    first = sessions.create({"role": "Admin"})
+    second = sessions.create({"role": "Supervisor"})
+    assert sessions.get(first) == {"role": "Admin"}
+    sessions.create({"role": "Supervisor"})
+    # Se descarta la de uso más antiguo (second), no la recién consultada
+    assert sessions.get(second) is None and sessions.get(first) is not None
+    now[0] += 11
+    assert sessions.get(first) is None
+    sessions.delete("missing")
+    assert sessions.get(None) is None
@@ -0,0 +1,19 @@
+import pytest
+from thermal import parse_settings
+
+DEFAULTS = {"hot_threshold": 50.0, "alarm_on": 60.0, "alarm_off": 55.0, "cold_threshold": 5.0}
+
+
+def test_defaults_fill_missing_keys_and_extra_keys_are_ignored():
+    settings = parse_settings({"alarm_on": "70", "other": 1}, DEFAULTS)
+    assert settings == {**DEFAULTS, "alarm_on": 70.0}
+
+
+def test_equal_thresholds_are_allowed():
+    assert parse_settings({"alarm_on": 60, "alarm_off": 60}, DEFAULTS)["alarm_off"] == 60.0
+
+
+@pytest.mark.parametrize("values", [{"alarm_off": 65}, {"alarm_on": "abc"}, {"hot_threshold": None}])
+def test_invalid_settings(values):
+    with pytest.raises((ValueError, TypeError)):
+        parse_settings(values, DEFAULTS)
@@ -0,0 +1,66 @@
+import numpy as np
+from tracker import Tracker, iou_matrix, to_numpy
+
+
+def box(x1, y1, x2, y2, conf=0.9, cls=0):
+    return [x1, y1, x2, y2, conf, cls]
+
+
+def test_iou_matrix():
+    a = np.array([[0, 0, 10, 10]], dtype=np.float32)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], dtype=np.float32)
+    np.testing.assert_allclose(iou_matrix(a, b), [[1.0, 1 / 3, 0.0]], rtol=1e-5)
+    assert iou_matrix(a, np.zeros((0, 4), dtype=np.float32)).shape == (1, 0)
+
+
+def test_to_numpy_accepts_none_and_lists():
+    assert to_numpy(None).shape == (0, 6)
+    assert to_numpy([box(0, 0, 1, 1)]).shape == (1, 6)
+
+
+def test_track_confirmed_after_min_hits_keeps_id():
+    tracker = Tracker(min_hits=2)
+    tracker.update([box(100, 100, 200, 200)], 0.0)
+    assert len(tracker.active(0.0)) == 0
+    tracker.update([box(102, 100, 202, 200)], 0.25)
+    active = tracker.active(0.25)
+    assert len(active) == 1
+    assert active[0, 6] == 1
+
+
+def test_classes_are_not_matched_to_each_other():
+    tracker = Tracker(min_hits=1)
+    tracker.update([box(100, 100, 200, 200, cls=0)], 0.0)
+    tracker.update([box(100, 100, 200, 200, cls=1)], 0.25)
+    assert sorted(tracker.active(0.25)[:, 6].tolist()) == [1, 2]
+
+
+def test_track_survives_misses_then_expires():
+    tracker = Tracker(min_hits=1, max_misses=2)
+    tracker.update([box(100, 100, 200, 200)], 0.0)
+    for i in range(2):
+        tracker.update([], 0.25 * (i + 1))
+        assert len(tracker.active(0.25 * (i + 1))) == 1
+    tracker.update([], 0.75)
+    assert len(tracker.active(0.75)) == 0
+
+
+def test_extrapolation_follows_motion_and_is_capped():
+    tracker = Tracker(min_hits=1, max_extrapolation=0.5)
+    for i in range(6):
+        x = 100 + 40 * i
+        tracker.update([box(x, 100, x + 100, 200)], 0.25 * i)
+    now = 0.25 * 5
+    x_now = tracker.active(now)[0, 0]
+    assert tracker.active(now + 0.2)[0, 0] > x_now
+    assert tracker.active(now + 5)[0, 0] == tracker.active(now + 0.5)[0, 0]
+
+
+def test_update_dwell():
+    tracker = Tracker(min_hits=1)
+    tracker.update([box(100, 100, 200, 200)], 0.0)
+    assert tracker.update_dwell({1: 1}, 10.0) == 0.0
+    assert tracker.update_dwell({1: 1}, 12.5) == 2.5
+    # Cambiar de área reinicia la permanencia
+    assert tracker.update_dwell({1: 2}, 13.0) == 0.0
+    assert tracker.update_dwell({}, 14.0) == 0.0
@@ -0,0 +1,134 @@
+import time
+import numpy as np
+import cv2
+
+# Estados del panel de Temperatura, en el orden de la interfaz
+THERMAL_CLASSES = ['Calor', 'Estable', 'Frío']
+
+
+def parse_settings(values, defaults):
+    # Umbrales completos a partir de `values` (claves de `defaults`; el resto se ignora).
+    # ValueError si no son números o si alarm_off > alarm_on (la alarma oscilaría en cada frame)
+    settings = {key: float(values.get(key, value)) for key, value in defaults.items()}
+    if settings["alarm_off"] > settings["alarm_on"]:
+        raise ValueError(f"alarm_off ({settings['alarm_off']}) no puede ser mayor que alarm_on ({settings['alarm_on']})")
+    return settings
+
+
+class ThermalCalibration:
+    """Convierte frames de una cámara térmica a un mapa de temperatura (°C, float32).
+
+    - 'palette': cámaras de falso color. Se invierte el mapa de color (`palette`, p. ej.
+      cv2.COLORMAP_INFERNO) con una tabla de 32x32x32 colores cuantizados -> temperatura,
+      calculada una vez; por frame solo se indexa la tabla.
+    - 'linear': gris 8 bits (blanco = caliente) escalado a `temp_range`, o radiométrico de
+      16 bits: T = crudo * gain + offset (p. ej. TLinear de 0.01 K: gain=0.01, offset=-273.15).
+    """
+
+    def __init__(self, mode='palette', palette=cv2.COLORMAP_INFERNO, temp_range=(20.0, 120.0),
+                 gain=0.01, offset=-273.15):
+        self.mode = mode
+        self.gain = gain
+        self.offset = offset
+        low, high = temp_range
+        self.gray_lut = np.linspace(low, high, 256, dtype=np.float32)
+        self.color_lut = self.build_color_lut(palette, self.gray_lut) if mode == 'palette' else None
+
+    @staticmethod
+    def build_color_lut(palette, temperatures, chunk=4096):
+        colors = cv2.applyColorMap(np.arange(256, dtype=np.uint8).reshape(256, 1), palette).reshape(256, 3)
+        colors = colors.astype(np.float32)
+        # Centro de cada celda cuantizada (5 bits por canal), en el orden B, G, R del índice
+        levels = np.arange(32, dtype=np.float32) * 8 + 4
+        b, g, r = np.meshgrid(levels, levels, levels, indexing='ij')
+        cells = np.stack([b.ravel(), g.ravel(), r.ravel()], axis=1)
+        nearest = np.empty(len(cells), dtype=np.int64)
+        for start in range(0, len(cells), chunk):
+            block = cells[start:start + chunk]
+            distances = ((block[:, None, :] - colors[None, :, :]) ** 2).sum(axis=2)
+            nearest[start:start + chunk] = distances.argmin(axis=1)
+        return temperatures[nearest]
+
+    def to_temperature(self, frame):
+        if frame.dtype == np.uint16:
+            return frame.astype(np.float32) * self.gain + self.offset
+        if frame.ndim == 2:
+            return self.gray_lut[frame]
+        if self.mode != 'palette':
+            return self.gray_lut[frame[:, :, 0]]
+        index = (frame[:, :, 0] >> 3).astype(np.uint16) << 10
+        index |= (frame[:, :, 1] >> 3).astype(np.uint16) << 5
+        index |= frame[:, :, 2] >> 3
+        return self.color_lut[index]
+
+
+class ThermalAnalyzer:
+    """Estadísticas por área (máxima, media, fracción de píxeles calientes) y alarmas con histéresis.
+
+    Media y fracción caliente salen de dos imágenes integrales del frame, así cada área cuesta
+    cuatro lecturas sin importar su tamaño; la máxima se toma del recorte de cada área. Sin áreas
+    se analiza el frame completo como área 0. Una alarma se activa con máxima >= `alarm_on` y se
+    apaga recién con máxima < `alarm_off`.
+    """
+
+    def __init__(self, calibration, hot_threshold=50.0, alarm_on=60.0, alarm_off=55.0, cold_threshold=5.0):
+        self.calibration = calibration
+        self.defaults = parse_settings({}, {"hot_threshold": hot_threshold, "alarm_on": alarm_on,
+                                            "alarm_off": alarm_off, "cold_threshold": cold_threshold})
+        self.settings = dict(self.defaults)
+        # area_id -> instante en que se activó la alarma
+        self.alarm_since = {}
+
+    def configure(self, values):
+        # Umbrales de la cámara (/thermal_settings); las claves ausentes toman el valor por defecto
+        self.settings = parse_settings(values, self.defaults)
+
+    def reset(self):
+        self.alarm_since = {}
+
+    def area_stats(self, temps, rects):
+        height, width = temps.shape
+        if len(rects) == 0:
+            rects = np.array([[0, 0, width, height, 0]], dtype=np.int64)
+        x1 = np.clip(rects[:, 0], 0, width)
+        x2 = np.clip(rects[:, 2], 0, width)
+        y1 = np.clip(rects[:, 1], 0, height)
+        y2 = np.clip(rects[:, 3], 0, height)
+        # Áreas que quedan vacías al recortarlas al frame no tienen estadísticas
+        valid = (x2 > x1) & (y2 > y1)
+        x1, x2, y1, y2, area_ids = x1[valid], x2[valid], y1[valid], y2[valid], rects[valid, 4]
+        hot = (temps >= self.settings["hot_threshold"]).view(np.uint8)
+        sums = cv2.integral(temps, sdepth=cv2.CV_64F)
+        counts = cv2.integral(hot)
+        corners = lambda table: table[y2, x2] - table[y1, x2] - table[y2, x1] + table[y1, x1]
+        pixels = (x2 - x1) * (y2 - y1)
+        means = corners(sums) / pixels
+        hot_fraction = corners(counts) / pixels
+        maxima = [float(temps[a:b, c:d].max()) for a, b, c, d in zip(y1, y2, x1, x2)]
+        return {int(area_id): {"max": maximum, "mean": float(mean), "hot_fraction": float(fraction)}
+                for area_id, maximum, mean, fraction in zip(area_ids, maxima, means, hot_fraction)}
+
+    def analyze(self, frame, rects, now=None):
+        """Devuelve (mapa de temperatura, estadísticas por área, estados del panel)."""
+        now = now or time.time()
+        temps = self.calibration.to_temperature(frame)
+        stats = self.area_stats(temps, rects)
+        for area_id, area in stats.items():
+            # Se compara la máxima sin redondear: redondeada a 0.1 °C, 59.96 dispararía una alarma de 60
+            active = area_id in self.alarm_since
+            threshold = self.settings["alarm_off"] if active else self.settings["alarm_on"]
+            area["alarm"] = bool(area["max"] >= threshold)
+            if area["alarm"] and not active:
+                self.alarm_since[area_id] = now
+            elif not area["alarm"]:
+                self.alarm_since.pop(area_id, None)
+            area["alarm_seconds"] = round(now - self.alarm_since[area_id], 1) if area["alarm"] else 0.0
+        for area_id in set(self.alarm_since) - set(stats):
+            del self.alarm_since[area_id]
+        hot = any(area["alarm"] for area in stats.values())
+        cold = any(area["mean"] <= self.settings["cold_threshold"] for area in stats.values())
+        states = {"Calor": hot, "Estable": not hot and not cold, "Frío": cold and not hot}
+        for area in stats.values():
+            area.update(max=round(area["max"], 1), mean=round(area["mean"], 1),
+                        hot_fraction=round(area["hot_fraction"], 4))
+        return temps, stats, states
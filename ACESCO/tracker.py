@@ -0,0 +1,126 @@
+import itertools
+import numpy as np
+
+
+def to_numpy(preds):
+    # Tensores de torch (results.xyxy[i]) o arrays ya en NumPy -> array float (N, 6)
+    if preds is None:
+        return np.zeros((0, 6), dtype=np.float32)
+    if hasattr(preds, 'cpu'):
+        preds = preds.cpu().numpy()
+    return np.asarray(preds, dtype=np.float32).reshape(-1, 6)
+
+
+def iou_matrix(boxes_a, boxes_b):
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float32)
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+
+class Track:
+    __slots__ = ('track_id', 'box', 'velocity', 'conf', 'cls', 'hits', 'misses', 'last_update', 'area_since')
+
+    def __init__(self, track_id, box, conf, cls, now):
+        self.track_id = track_id
+        self.box = np.asarray(box, dtype=np.float32)
+        self.velocity = np.zeros(4, dtype=np.float32)
+        self.conf = float(conf)
+        self.cls = int(cls)
+        self.hits = 1
+        self.misses = 0
+        self.last_update = now
+        self.area_since = {}
+
+
+class Tracker:
+    """Tracker IoU con filtro alfa-beta (Kalman de velocidad constante simplificado).
+
+    `update` se llama con las detecciones de cada corrida del modelo; `active` devuelve las
+    cajas extrapoladas al instante pedido, de modo que el overlay puede ir a más fps que el
+    modelo. Un track solo se elimina tras `max_misses` corridas seguidas sin detección, lo que
+    evita que un fallo aislado del modelo reinicie la ocupación de un área.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_misses=3, min_hits=2, alpha=0.6, beta=0.2, max_extrapolation=0.5):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.alpha = alpha
+        self.beta = beta
+        self.max_extrapolation = max_extrapolation
+        self.tracks = []
+        self.ids = itertools.count(1)
+
+    def reset(self):
+        self.tracks = []
+
+    def predict(self, track, now):
+        dt = min(max(now - track.last_update, 0.0), self.max_extrapolation)
+        return track.box + track.velocity * dt
+
+    def update(self, preds, now):
+        detections = to_numpy(preds)
+        predicted = np.array([self.predict(t, now) for t in self.tracks], dtype=np.float32).reshape(-1, 4)
+        iou = iou_matrix(predicted, detections[:, :4])
+        if iou.size:
+            iou[np.array([t.cls for t in self.tracks])[:, None] != detections[None, :, 5].astype(int)] = 0
+
+        matched_tracks, matched_dets = set(), set()
+        while iou.size:
+            t, d = np.unravel_index(np.argmax(iou), iou.shape)
+            if iou[t, d] < self.iou_threshold:
+                break
+            track = self.tracks[t]
+            dt = now - track.last_update
+            residual = detections[d, :4] - predicted[t]
+            track.box = predicted[t] + self.alpha * residual
+            if dt > 0:
+                track.velocity = track.velocity + self.beta * residual / dt
+            track.conf = float(detections[d, 4])
+            track.hits += 1
+            track.misses = 0
+            track.last_update = now
+            matched_tracks.add(t)
+            matched_dets.add(d)
+            iou[t, :] = -1
+            iou[:, d] = -1
+
+        alive = []
+        for i, track in enumerate(self.tracks):
+            if i not in matched_tracks:
+                track.misses += 1
+                track.box = predicted[i]
+                track.velocity *= 0.5
+                track.last_update = now
+                if track.misses > self.max_misses:
+                    continue
+            alive.append(track)
+        for d in range(len(detections)):
+            if d not in matched_dets:
+                x1, y1, x2, y2, conf, cls = detections[d]
+                alive.append(Track(next(self.ids), (x1, y1, x2, y2), conf, cls, now))
+        self.tracks = alive
+
+    def active(self, now):
+        # Tracks confirmados como array (N, 7): x1, y1, x2, y2, conf, cls, track_id
+        rows = [(*self.predict(t, now), t.conf, t.cls, t.track_id) for t in self.tracks if t.hits >= self.min_hits]
+        return np.array(rows, dtype=np.float32).reshape(-1, 7)
+
+    def update_dwell(self, occupancy, now):
+        # occupancy: {track_id: area_id} de los tracks dentro de un área habilitada.
+        # Actualiza la permanencia de todos los tracks y devuelve la mayor (s).
+        max_dwell = 0.0
+        for track in self.tracks:
+            area_id = occupancy.get(track.track_id)
+            for other in [a for a in track.area_since if a != area_id]:
+                del track.area_since[other]
+            if area_id is not None:
+                max_dwell = max(max_dwell, now - track.area_since.setdefault(area_id, now))
+        return max_dwell
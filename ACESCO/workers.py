@@ -0,0 +1,387 @@
+"""Cámaras en procesos separados: cada worker corre captura + inferencia + grabación de una cámara.
+
+El proceso web conserva un `CameraWorker` por cámara con la misma interfaz que `VideoStream`
+(módulo, áreas, configuración, detecciones, broadcaster MJPEG). Los frames procesados llegan
+por un anillo en memoria compartida (`SharedFrameRing`) y los metadatos (detecciones, eventos
+SSE, estadísticas) por una cola. Los comandos de control van por otra cola y se confirman con
+una copia del estado de control, que también sirve para restaurar el worker si se reinicia.
+"""
+import time
+import queue
+import logging
+import itertools
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import cv2
+from broadcaster import FrameBroadcaster
+
+# Métodos de VideoStream que el proceso web puede invocar en el worker
+COMMANDS = {'set_module_active', 'add_rectangle', 'delete_area', 'delete_all', 'set_current_area',
+            'update_config', 'set_model_variant', 'set_rectangles', 'set_load_level',
+            'set_thermal_settings'}
+
+
+class SharedFrameRing:
+    """Anillo de frames en memoria compartida: un escritor (worker) y un lector (proceso web).
+
+    La cabecera guarda la secuencia del frame de cada slot; el escritor la pone en 0 mientras
+    copia, y el lector descarta la lectura si la secuencia cambió durante su copia.
+    """
+
+    def __init__(self, shape, slots=4, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        header_bytes = 8 * slots
+        size = header_bytes + slots * int(np.prod(self.shape))
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # El proceso web es el dueño del segmento: solo él lo libera (unlink)
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.seqs = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf, offset=header_bytes)
+        if self.owner:
+            self.seqs[:] = 0
+        self.next_index = 0
+
+    def write(self, frame, seq):
+        index = self.next_index
+        self.next_index = (index + 1) % self.slots
+        if frame.shape != self.shape:
+            frame = cv2.resize(frame, (self.shape[1], self.shape[0]))
+        self.seqs[index] = 0
+        np.copyto(self.frames[index], frame)
+        self.seqs[index] = seq
+        return index
+
+    def read(self, index, seq):
+        if self.seqs[index] != seq:
+            return None
+        frame = self.frames[index].copy()
+        if self.seqs[index] != seq:
+            return None
+        return frame
+
+    def close(self):
+        # Las vistas NumPy deben soltarse antes de cerrar el mmap
+        self.seqs = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class ForwardingEventHub:
+    """Reemplazo de EventHub dentro del worker: reenvía los eventos SSE al proceso web."""
+
+    def __init__(self, results):
+        self.results = results
+
+    def publish(self, camera_id, event, data):
+        self.results.put(('event', camera_id, event, data))
+
+    def subscriber_count(self):
+        return 0
+
+
+def control_state(stream):
+    return {"active_module": stream.active_module, "use_model": stream.use_model,
+            "rectangles": list(stream.rectangles), "current_area": stream.current_area,
+            "config": dict(stream.config), "model_variant": stream.model_variant, "load_level": stream.load_level,
+            "thermal": dict(stream.thermal_settings)}
+
+
+def apply_command(stream, method, args):
+    if method == 'set_rectangles':
+        stream.rectangles = [tuple(r) for r in args[0]]
+    else:
+        getattr(stream, method)(*args)
+
+
+def restore(stream, control):
+    # Estado de control que tenía el worker anterior (reinicio tras una caída)
+    if not control:
+        return
+    if control.get("active_module"):
+        stream.set_module_active(True, control["active_module"])
+    stream.rectangles = [tuple(r) for r in control.get("rectangles", [])]
+    stream.current_area = control.get("current_area", 1)
+    if control.get("config"):
+        stream.update_config(control["config"])
+    if control.get("thermal"):
+        stream.set_thermal_settings(control["thermal"])
+    if control.get("load_level"):
+        stream.set_load_level(control["load_level"])
+    if control.get("model_variant"):
+        try:
+            stream.set_model_variant(control["model_variant"])
+        except Exception as e:
+            logging.error(f"No se pudo restaurar el modelo {control['model_variant']}: {e}")
+
+
+def serve(stream, ring, commands, results, control=None, extra_stats=None, stats_interval=1.0):
+    """Bucle de control del worker: aplica comandos y envía estadísticas hasta recibir 'stop'."""
+    restore(stream, control)
+    results.put(('control', None, control_state(stream)))
+    parent = multiprocessing.parent_process()
+    next_stats = 0.0
+    while parent is None or parent.is_alive():
+        now = time.time()
+        if now >= next_stats:
+            stats = stream.get_stats()
+            if extra_stats:
+                stats.update(extra_stats())
+            results.put(('stats', stats))
+            next_stats = now + stats_interval
+        try:
+            command_id, method, args = commands.get(timeout=max(0.05, next_stats - now))
+        except queue.Empty:
+            continue
+        if method == 'stop':
+            break
+        if method not in COMMANDS:
+            logging.error(f"Comando de worker desconocido: {method}")
+            continue
+        try:
+            apply_command(stream, method, args)
+        except Exception as e:
+            logging.error(f"Error al aplicar {method} en la cámara {stream.camera_id}: {e}")
+        results.put(('control', command_id, control_state(stream)))
+    stream.stop()
+
+
+class FrameSink:
+    """Lado worker: copia cada resultado publicado al anillo compartido y avisa por la cola."""
+
+    def __init__(self, ring, results):
+        self.ring = ring
+        self.results = results
+
+    def __call__(self, result):
+        if result.frame is None:
+            return
+        index = self.ring.write(result.frame, result.seq)
+        self.results.put(('frame', index, result.seq, result.timestamp, result.detections, result.person_in_area))
+
+
+class CameraWorker:
+    """Lado web de una cámara que corre en su propio proceso, supervisado y reiniciado si cae."""
+
+    def __init__(self, camera_id, url, target, tiers, empty_result, on_event=None, frame_size=(640, 480),
+                 slots=4, restart_delay=2.0, command_timeout=2.0, control=None, load_levels=None):
+        self.camera_id = camera_id
+        self.url = url
+        self.target = target
+        self.on_event = on_event
+        self.restart_delay = restart_delay
+        self.command_timeout = command_timeout
+        self.context = multiprocessing.get_context('spawn')
+        self.commands = self.context.Queue()
+        self.results = self.context.Queue()
+        self.ring = SharedFrameRing((frame_size[1], frame_size[0], 3), slots)
+        self.broadcaster = FrameBroadcaster(tiers)
+        # El stream MJPEG se codifica en este proceso: la calidad del modo de carga se aplica aquí
+        self.load_levels = load_levels
+        self.load_level = 0
+        self.result_type = type(empty_result)
+        self.latest_result = empty_result
+        self.control = {"active_module": None, "use_model": False, "rectangles": [], "current_area": 1,
+                        "config": {}, "model_variant": None}
+        # Estado inicial (p. ej. áreas y configuración guardadas) que el worker aplica al arrancar
+        self.control.update(control or {})
+        self.stats = {"state": 'connecting', "state_since": time.time(), "reconnect_attempts": 0}
+        self.pending = {}
+        self.ids = itertools.count(1)
+        self.restarts = 0
+        self.torn_frames = 0
+        self.running = True
+        self.process = None
+        self.start_process()
+        self.reader_thread = threading.Thread(target=self.read_results, daemon=True)
+        self.reader_thread.start()
+        self.supervisor_thread = threading.Thread(target=self.supervise, daemon=True)
+        self.supervisor_thread.start()
+
+    def start_process(self):
+        self.process = self.context.Process(
+            target=self.target, name=f"camara-{self.camera_id}", daemon=True,
+            args=(self.camera_id, self.url, self.ring.name, self.commands, self.results, dict(self.control)))
+        self.process.start()
+        logging.info(f"Worker de la cámara {self.camera_id} iniciado (pid {self.process.pid})")
+
+    def supervise(self):
+        while self.running:
+            time.sleep(1.0)
+            if not self.running or self.process.is_alive():
+                continue
+            self.restarts += 1
+            delay = min(self.restart_delay * self.restarts, 30)
+            logging.error(f"Worker de la cámara {self.camera_id} terminó (código {self.process.exitcode}); "
+                          f"reinicio {self.restarts} en {delay:.0f}s")
+            self.stats = {**self.stats, "state": 'reconnecting', "state_since": time.time()}
+            time.sleep(delay)
+            if self.running:
+                self.start_process()
+
+    def read_results(self):
+        while self.running:
+            try:
+                message = self.results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            kind = message[0]
+            if kind == 'frame':
+                self.on_frame(*message[1:])
+            elif kind == 'event':
+                if self.on_event:
+                    self.on_event(*message[1:])
+            elif kind == 'stats':
+                self.stats = message[1]
+            elif kind == 'control':
+                self.control = message[2]
+                done = self.pending.get(message[1])
+                if done:
+                    done.set()
+
+    def on_frame(self, index, seq, timestamp, detections, person_in_area):
+        frame = self.ring.read(index, seq)
+        if frame is None:
+            # El worker ya reutilizó el slot: este frame se pierde, llega el siguiente
+            self.torn_frames += 1
+            return
+        frame.setflags(write=False)
+        result = self.result_type(seq, timestamp, frame, detections, person_in_area)
+        self.latest_result = result
+        self.broadcaster.publish(result)
+
+    def call(self, method, *args):
+        command_id = next(self.ids)
+        done = threading.Event()
+        self.pending[command_id] = done
+        self.commands.put((command_id, method, args))
+        # Se espera la confirmación para que las lecturas siguientes (p. ej. save_areas) vean el cambio
+        if self.process.is_alive():
+            done.wait(self.command_timeout)
+        self.pending.pop(command_id, None)
+
+    @property
+    def detections(self):
+        return self.latest_result.detections
+
+    @property
+    def person_in_area(self):
+        return self.latest_result.person_in_area
+
+    @property
+    def rectangles(self):
+        return self.control["rectangles"]
+
+    @rectangles.setter
+    def rectangles(self, rectangles):
+        self.call('set_rectangles', [tuple(r) for r in rectangles])
+
+    @property
+    def active_module(self):
+        return self.control["active_module"]
+
+    @property
+    def use_model(self):
+        return self.control["use_model"]
+
+    @property
+    def config(self):
+        return self.control["config"]
+
+    @property
+    def current_area(self):
+        return self.control["current_area"]
+
+    @property
+    def model_variant(self):
+        return self.control["model_variant"]
+
+    @property
+    def thermal_stats(self):
+        # Llega con las estadísticas del worker (una vez por segundo)
+        return self.stats.get("thermal", {})
+
+    @property
+    def state(self):
+        return self.stats.get("state", 'connecting')
+
+    @property
+    def state_since(self):
+        return self.stats.get("state_since", 0.0)
+
+    @property
+    def reconnect_attempts(self):
+        return self.stats.get("reconnect_attempts", 0)
+
+    def get_processed_frame(self):
+        return self.latest_result.frame
+
+    def detection_state(self, result=None):
+        result = result or self.latest_result
+        return {"camera": self.camera_id, "detections": result.detections, "person_in_area": result.person_in_area}
+
+    def set_module_active(self, active, module=None):
+        self.call('set_module_active', active, module)
+
+    def add_rectangle(self, x1, y1, x2, y2):
+        self.call('add_rectangle', x1, y1, x2, y2)
+
+    def delete_area(self, area_type):
+        self.call('delete_area', area_type)
+
+    def delete_all(self):
+        self.call('delete_all')
+
+    def set_current_area(self, area):
+        self.call('set_current_area', area)
+
+    def update_config(self, config):
+        self.call('update_config', config)
+
+    def set_model_variant(self, variant):
+        self.call('set_model_variant', variant)
+
+    @property
+    def thermal_settings(self):
+        return self.control.get("thermal", {})
+
+    def set_thermal_settings(self, settings):
+        self.call('set_thermal_settings', settings)
+
+    def set_load_level(self, level):
+        self.call('set_load_level', level)
+        if self.load_levels:
+            self.broadcaster.quality_scale = self.load_levels[level]["jpeg_scale"]
+        self.load_level = level
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats.update({
+            "subscribers": self.broadcaster.subscribers,
+            "stream_dropped_frames": self.broadcaster.dropped_frames + self.torn_frames,
+            "encode_latency": self.broadcaster.encode_latency,
+            "worker_pid": self.process.pid if self.process else None,
+            "worker_restarts": self.restarts,
+            "load_level": self.load_level,
+        })
+        return stats
+
+    def stop(self):
+        self.running = False
+        self.commands.put((0, 'stop', ()))
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=2)
+        self.reader_thread.join(timeout=1)
+        self.broadcaster.stop()
+        self.ring.close()